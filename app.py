@@ -1,25 +1,74 @@
-from pydoc import text
 from fastapi import FastAPI, Form, File, UploadFile, Cookie
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.requests import Request
 from fastapi.staticfiles import StaticFiles
 from models import Resume, Job, User
+import asyncio
+import hashlib
+import html
 import uuid
+from contextlib import asynccontextmanager
 
-from parse.parse_plaintext import get_text_from_pdf, clean_text, extract_keywords_and_phrases
+from parse.parse_plaintext import get_text_from_pdf, clean_text, extract_keywords_and_phrases, DocumentRejected
 from parse.parse_job import parse_job
 from format.format import format_resume
-from score.score import score_resume
-from reword.reword import reword_bullet
-
-app = FastAPI()
+from score.score import score_resume, build_keyword_index
+from reword.reword import reword_bullet, accept_reword, index_bullets
+from workers.workers import run_in_pool, pool_stats, PoolSaturated, shutdown_pool
+from warmup.warmup import warm_up, state as warmup_state
+from cache.cache import LRUCache
+from sessions.backends import get_backend
+from llm.client import usage_stats
+from embed.store import store as keyword_embeddings
+from config import RESUME_CACHE_SIZE, RESUME_CACHE_DIR, RESUME_CACHE_DISK_SIZE, JOB_CACHE_SIZE, JOB_CACHE_TTL
+from config import SESSION_SWEEP_INTERVAL, MAX_UPLOAD_BYTES
+
+#uploads are read from the spooled temp file in chunks of this size while hashing and counting bytes
+UPLOAD_CHUNK_BYTES = 64 * 1024
+#room for the multipart boundaries and part headers around the file in the request's Content-Length
+MULTIPART_OVERHEAD_BYTES = 16 * 1024
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    #warm up in the background so the worker accepts connections (and answers /healthz) straight away
+    #load balancers should route on /ready, which stays 503 until every warm-up step is done
+    warmup_task = asyncio.create_task(warm_up())
+    sweeper_task = asyncio.create_task(user_sessions.sweep_forever(SESSION_SWEEP_INTERVAL))
+    yield
+    warmup_task.cancel()
+    sweeper_task.cancel()
+    await user_sessions.close()
+    shutdown_pool(wait=False)
+
+app = FastAPI(lifespan=lifespan)
 templates = Jinja2Templates('./templates')
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="templates"), name="static")
 
-user_sessions = {}
+@app.middleware("http")
+#rejects oversized resume uploads from their Content-Length before the multipart body is read and spooled
+#uploads without a Content-Length (chunked) are spooled in full by the multipart parser first,
+#they are only rejected once handle_resume_file reads past MAX_UPLOAD_BYTES, so a reverse proxy body limit is still needed
+async def limit_upload_size(request: Request, call_next):
+    if request.url.path == "/handle-resume-file":
+        content_length = request.headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES:
+            return upload_too_large_response()
+    return await call_next(request)
+
+#bounded by entry count, idle time and estimated memory, so bots hitting / cannot grow it forever
+#SESSION_BACKEND=sqlite or redis shares sessions between workers, see sessions/backends.py
+user_sessions = get_backend()
+
+#parsed resumes keyed by the sha256 of the uploaded PDF, value is (Resume, formatted resume html)
+#a repeat upload of the same file skips PDF extraction, spaCy and the OpenAI section parsing calls
+resume_cache = LRUCache(RESUME_CACHE_SIZE, RESUME_CACHE_DIR, RESUME_CACHE_DISK_SIZE)
+
+#processed Job objects (keywords + highlighted html) keyed by the sha256 of the cleaned job description
+#shared across sessions since recruiters paste the same posting for many candidates
+job_cache = LRUCache(JOB_CACHE_SIZE, ttl=JOB_CACHE_TTL)
 
 @app.get("/")
 #tells FastAPI to look for a cookie named session_id
@@ -27,7 +76,7 @@ user_sessions = {}
 #and then response.set_cookie will create it
 async def home(request: Request, session_token: str = Cookie(None)) -> HTMLResponse:
     #checks if there is a user session in the cookie, if not creates uuid and adds to user_sessions
-    session_token = handle_cookie(session_token, user_sessions)
+    session_token, user = await handle_cookie(session_token)
 
     response = templates.TemplateResponse(request, "index.html", {"text": ""})
     
@@ -39,74 +88,118 @@ async def home(request: Request, session_token: str = Cookie(None)) -> HTMLRespo
         httponly = True,
     )
 
+    await user_sessions.save(session_token, user)
     return response
 
 @app.post("/handle-resume-file")
 async def handle_resume_file(resume_file: UploadFile = File(...), session_token: str = Cookie(None)):
-    session_token = handle_cookie(session_token, user_sessions)
-    
-    resume_contents = await resume_file.read()
+    session_token, user = await handle_cookie(session_token)
+
+    #the upload is already spooled to a temp file, stream it in chunks so it is never held in memory as one buffer
+    if resume_file.size is not None and resume_file.size > MAX_UPLOAD_BYTES:
+        return upload_too_large_response()
+    resume_hash = hashlib.sha256()
+    resume_size = 0
+    while chunk := await resume_file.read(UPLOAD_CHUNK_BYTES):
+        resume_size += len(chunk)
+        if resume_size > MAX_UPLOAD_BYTES:
+            return upload_too_large_response()
+        resume_hash.update(chunk)
+    await resume_file.seek(0)
+
+    #serve repeat uploads of the same file straight from the cache
+    resume_key = resume_hash.hexdigest()
+    cached = resume_cache.get(resume_key)
+    #entries cached before bullets were indexed only hold (resume, html), treat them as a miss
+    if cached is not None and len(cached) == 3:
+        resume, resume_html, bullets = cached
+        user.resume = resume
+        user.resume_html = resume_html
+        set_bullets(user, bullets)
+        await user_sessions.save(session_token, user)
+        return HTMLResponse(resume_html)
 
     resume = Resume()
     
-    # extract text from the PDF
-    resume.plaintext = get_text_from_pdf(resume_contents)
-
-    #this is actually what is returned as an html response, the other stuff below is just to process the resume and extract keywords
-    formatted_resume = await format_resume(resume.plaintext, resume)
-
-    # Store the HTML string content (decode the bytes from the response)
-    user_sessions[session_token].resume_html = formatted_resume.body.decode('utf-8')
-
-    #extract important words/phrases
-    resume.keywords = extract_keywords_and_phrases(resume.plaintext)
+    try:
+        # extract text from the PDF on the parse pool so a large PDF does not stall the event loop
+        #page count and extraction time are capped, see PDF_MAX_PAGES and PDF_EXTRACT_TIMEOUT
+        resume.plaintext = await run_in_pool(get_text_from_pdf, resume_file.file)
+        if not resume.plaintext.strip():
+            return rejected_response("No text was found in this PDF. Scanned resumes are not supported, please upload a PDF with selectable text.")
+
+        #this is actually what is returned as an html response, the other stuff below is just to process the resume and extract keywords
+        formatted_resume, sections_complete = await format_resume(resume.plaintext, resume)
+
+        #decode the bytes from the response, the session only takes it once the whole pipeline has succeeded
+        resume_html = formatted_resume.body.decode('utf-8')
+
+        #extract important words/phrases
+        resume.keywords = await run_in_pool(extract_keywords_and_phrases, resume.plaintext)
+        resume.keyword_index = build_keyword_index(resume.keywords)
+
+        #split and embed the bullets once so every reword only needs a matrix-vector product
+        bullets = await run_in_pool(index_bullets, resume_html)
+    except PoolSaturated:
+        return busy_response()
+    except DocumentRejected as e:
+        return rejected_response(str(e))
 
     #enter the current resume into the user session
-    user_sessions[session_token].resume = resume
+    user.resume = resume
+    user.resume_html = resume_html
+    set_bullets(user, bullets)
+
+    #a failed or partly parsed resume (e.g. a transient OpenAI error) is served but not cached, so a re-upload retries it
+    if sections_complete:
+        resume_cache.set(resume_key, (resume, resume_html, bullets))
 
+    await user_sessions.save(session_token, user)
     return formatted_resume
 
 @app.post("/handle-job-description")
 async def handle_job_description(job_description_text: str = Form(), session_token: str = Cookie(None))-> HTMLResponse:
-    session_token = handle_cookie(session_token, user_sessions)
+    session_token, user = await handle_cookie(session_token)
+
+    #key on the cleaned text so whitespace and bullet differences in the pasted posting still hit
+    job_key = hashlib.sha256(clean_text(job_description_text).encode('utf-8')).hexdigest()
+    job = job_cache.get(job_key)
+    if job is None:
+        try:
+            #clean, extract keywords and highlight them on the parse pool
+            job = await run_in_pool(process_job_description, job_description_text)
+        except PoolSaturated:
+            return busy_response()
+        job_cache.set(job_key, job)
 
-    job = Job()
-    #remove common words, spaces, bullets, etc
-    job.plaintext = clean_text(job_description_text)
-    #extract only the important words from the job description text
-    job.keywords = extract_keywords_and_phrases(job.plaintext)
-    #fill in job.html with job description and wrap keywords in span element
-    job = parse_job(job)
     #enter the current job into the user session
-    user_sessions[session_token].job = job
+    user.job = job
 
     #reset unmatched keywords list (if the user spams the get insights button)
-    user_sessions[session_token].unmatched_keywords = []
+    user.unmatched_keywords = []
 
     #scores the compatibility of the resume and the job description based on the job and resume entered into user_session
-    result = await score_resume(user_sessions[session_token])
-    if result:
-        user_sessions[session_token].update(result)
+    await score_resume(user)
 
-    score = f'{round((len(user_sessions[session_token].matched_keywords) / len(job.keywords) * 100)) if len(job.keywords) > 0 else 0}%'
+    score = f'{round((len(user.matched_keywords) / len(job.keywords) * 100)) if len(job.keywords) > 0 else 0}%'
 
     #really weird return statement BUT it basically:
     #first returns the formatted job html (highlights keywords) to original target (.job-description)
     #second returns the user's score to the score-display div by using hx-swap-oob
     unmatched_keywords_html = "<p>"
-    for keyword_entry in user_sessions[session_token].unmatched_keywords:
+    for keyword_entry in user.unmatched_keywords:
         unmatched_keywords_html += f"{keyword_entry}, "
     unmatched_keywords_html = unmatched_keywords_html[:-2]
     unmatched_keywords_html += "</p>"
     
     matched_keywords_html = "<p>"
-    for keyword_entry in user_sessions[session_token].matched_keywords.keys():
+    for keyword_entry in user.matched_keywords.keys():
         matched_keywords_html += f"{keyword_entry}, "
     matched_keywords_html = matched_keywords_html[:-2]
     matched_keywords_html += "</p>"
 
-    if user_sessions[session_token].unmatched_keywords:
-        first_keyword_prompt = user_sessions[session_token].unmatched_keywords[0]
+    if user.unmatched_keywords:
+        first_keyword_prompt = user.unmatched_keywords[0]
 
 
         #returns the score and score details, matched and unmatched keyworrds, and begins the unmatched keyword prompting loop
@@ -116,7 +209,7 @@ async def handle_job_description(job_description_text: str = Form(), session_tok
                                 <div id="score-details">
                                     <div id="score-details-text">
                                         <h2>Score: {score}</h2>
-                                        <p>Matched {len(user_sessions[session_token].matched_keywords)} {'keyword' if len(user_sessions[session_token].matched_keywords) == 1 else 'keywords'} out of {len(job.keywords)} {'keyword' if len(job.keywords) == 1 else 'keywords'}.</p>
+                                        <p>Matched {len(user.matched_keywords)} {'keyword' if len(user.matched_keywords) == 1 else 'keywords'} out of {len(job.keywords)} {'keyword' if len(job.keywords) == 1 else 'keywords'}.</p>
                                     </div>
                                 </div>
                                 <div id="keywords-identified">
@@ -169,11 +262,12 @@ async def handle_job_description(job_description_text: str = Form(), session_tok
             httponly = True,
             )
         
+        await user_sessions.save(session_token, user)
         return response
 
     else:
         response = HTMLResponse(f"""
-                            {user_sessions[session_token].resume_html}
+                            {user.resume_html}
                             <div id="job-description" hx-swap-oob="true">
                                 <div class="reword-prompt">
                                     No unmatched keywords detected. Please either enter a longer job description or export.
@@ -188,27 +282,56 @@ async def handle_job_description(job_description_text: str = Form(), session_tok
             httponly = True,
             )
         
+        await user_sessions.save(session_token, user)
         return response
 
 
+#hit/miss counters for the resume and job caches plus parse pool load, OpenAI usage and session store size, for monitoring
+@app.get("/cache-stats")
+async def cache_stats() -> dict:
+    return {
+        "resume_cache": resume_cache.stats(),
+        "job_cache": job_cache.stats(),
+        "parse_pool": pool_stats(),
+        "openai": usage_stats(),
+        "keyword_embeddings": keyword_embeddings.stats(),
+        "sessions": user_sessions.stats(),
+    }
+
+
+#liveness: the process is up and serving, whether or not it is warm
+@app.get("/healthz")
+async def healthz() -> dict:
+    return {"status": "ok"}
+
+
+#readiness: 503 until the models and NLP resources are loaded, so only warm workers get traffic
+@app.get("/ready")
+async def ready() -> JSONResponse:
+    return JSONResponse(warmup_state, status_code=200 if warmup_state["ready"] else 503)
+
+
 #handles rewording after the user responds yes/no to if theyve encountered the keyword
 @app.post("/reword")
 async def reword(reword_answer: str = Form(), keyword: str = Form(), session_token: str = Cookie(None)) -> HTMLResponse:
-    session_token = handle_cookie(session_token, user_sessions)
+    session_token, user = await handle_cookie(session_token)
     #if the user would like to keep the reworded bullet   
     if reword_answer == "Yes":
         #sets user_session[resume_html_new] as the reworded html, preserves original html as user_session[resume_html]
-        await reword_bullet(keyword, user_sessions[session_token])
+        try:
+            await reword_bullet(keyword, user)
+        except PoolSaturated:
+            return busy_response()
 
         #If there are still unmatched keywords, remove the most recent one and set the new first one to be the one that is in the user prompt
-        if user_sessions[session_token].unmatched_keywords:
-            user_sessions[session_token].current_keyword = user_sessions[session_token].unmatched_keywords[0]
-            user_sessions[session_token].unmatched_keywords.pop(0)
+        if user.unmatched_keywords:
+            user.current_keyword = user.unmatched_keywords[0]
+            user.unmatched_keywords.pop(0)
 
         #Return html asking user if they accept the change or not
             
         response = HTMLResponse(f"""
-                                {user_sessions[session_token].resume_html_new}
+                                {user.resume_html_new}
                                 <div id="suggestion-container" hx-swap-oob="true">
                                     <div class="reword-prompt">
                                         Keep this reword?
@@ -237,18 +360,19 @@ async def reword(reword_answer: str = Form(), keyword: str = Form(), session_tok
             httponly = True,
             )
         
+        await user_sessions.save(session_token, user)
         return response
 
     #if the user has not encountered the keyword in their experience
     elif reword_answer == "No":
         #remove current keyword from the list
-        user_sessions[session_token].unmatched_keywords.pop(0)
+        user.unmatched_keywords.pop(0)
 
         #if there are still unmatched keywords left to prompt the user with
-        if user_sessions[session_token].unmatched_keywords:
-            first_keyword_prompt = user_sessions[session_token].unmatched_keywords[0]
+        if user.unmatched_keywords:
+            first_keyword_prompt = user.unmatched_keywords[0]
             response = HTMLResponse(f"""
-                                {user_sessions[session_token].resume_html}
+                                {user.resume_html}
                                 <div id="suggestion-container" hx-swap-oob="true">
                                     <div class="reword-prompt">
                                         Have you encountered the keyword "{first_keyword_prompt}" in your experiences?
@@ -277,12 +401,13 @@ async def reword(reword_answer: str = Form(), keyword: str = Form(), session_tok
                 httponly = True,
                 )
             
+            await user_sessions.save(session_token, user)
             return response
 
         #if there are no more unmatched keywords left
         else:
             response = HTMLResponse(f"""
-                                {user_sessions[session_token].resume_html}
+                                {user.resume_html}
                                 <div id="suggestion-container" hx-swap-oob="true">
                                     <div class="reword-prompt">
                                         No more unmatched keywords detected. Please either continue to edit resume below or export.
@@ -296,41 +421,45 @@ async def reword(reword_answer: str = Form(), keyword: str = Form(), session_tok
                 httponly = True,
                 )
             
+            await user_sessions.save(session_token, user)
             return response
 
             
 #handles resume formatting and resetting the prompt after the user responds yes/no to if they want to keep the bullet
 @app.post("/confirm")
 async def confirm(confirm_answer: str = Form(), session_token: str = Cookie(None)) -> HTMLResponse:
-    session_token = handle_cookie(session_token, user_sessions)
+    session_token, user = await handle_cookie(session_token)
     
     #if the user confirms they'd like to keep the bullet, update the html response and prompt with next keyword
     if confirm_answer == "Yes":
+        #the reworded html becomes the resume, only the changed bullet is re-embedded
+        try:
+            await accept_reword(user)
+        except PoolSaturated:
+            return busy_response()
+
         #adds the current keyword to the match keywords dictionary and recalculates the score
-        user_sessions[session_token].matched_keywords[user_sessions[session_token].current_keyword] = 1
-        job = user_sessions[session_token].job
-        score = f'{round((len(user_sessions[session_token].matched_keywords) / len(job.keywords) * 100)) if len(job.keywords) > 0 else 0}%'
+        user.matched_keywords[user.current_keyword] = 1
+        job = user.job
+        score = f'{round((len(user.matched_keywords) / len(job.keywords) * 100)) if len(job.keywords) > 0 else 0}%'
 
         unmatched_keywords_html = "<p>"
-        for keyword_entry in user_sessions[session_token].unmatched_keywords:
+        for keyword_entry in user.unmatched_keywords:
             unmatched_keywords_html += f"{keyword_entry}, "
         unmatched_keywords_html = unmatched_keywords_html[:-2]
         unmatched_keywords_html += "</p>"
         
         matched_keywords_html = "<p>"
-        for keyword_entry in user_sessions[session_token].matched_keywords.keys():
+        for keyword_entry in user.matched_keywords.keys():
             matched_keywords_html += f"{keyword_entry}, "
         matched_keywords_html = matched_keywords_html[:-2]
         matched_keywords_html += "</p>"
 
-        if user_sessions[session_token].unmatched_keywords:
-            first_keyword_prompt = user_sessions[session_token].unmatched_keywords[0]
-            user_sessions[session_token].resume_html = user_sessions[session_token].resume_html_new
-
-
+        if user.unmatched_keywords:
+            first_keyword_prompt = user.unmatched_keywords[0]
 
             response = HTMLResponse(f"""
-                                {user_sessions[session_token].resume_html}
+                                {user.resume_html}
                                 <div id="keywords-identified" hx-swap-oob="true">
                                 <div id="keywords-identified-details">
                                     <div class="keyword-details" id="total-keywords">
@@ -353,7 +482,7 @@ async def confirm(confirm_answer: str = Form(), session_token: str = Cookie(None
                             </div>
                                 <div id="score-details-text" hx-swap-oob="true">
                                     <h2>Score: {score}</h2>
-                                    <p>Matched {len(user_sessions[session_token].matched_keywords)} {'keyword' if len(user_sessions[session_token].matched_keywords) == 1 else 'keywords'} out of {len(job.keywords)} {'keyword' if len(job.keywords) == 1 else 'keywords'}.</p>
+                                    <p>Matched {len(user.matched_keywords)} {'keyword' if len(user.matched_keywords) == 1 else 'keywords'} out of {len(job.keywords)} {'keyword' if len(job.keywords) == 1 else 'keywords'}.</p>
                                 </div>
                                 <div id="suggestion-container" hx-swap-oob="true">
                                     <div class="reword-prompt">
@@ -384,15 +513,16 @@ async def confirm(confirm_answer: str = Form(), session_token: str = Cookie(None
                 httponly = True,
                 )
             
+            await user_sessions.save(session_token, user)
             return response
 
         #if the user would like to keep the last bullet update and they have no unmatched keywords left
         else:
             response = HTMLResponse(f"""
-                                {user_sessions[session_token].resume_html}
+                                {user.resume_html}
                                 <div id="score-details-text" hx-swap-oob="true">
                                     <h2>Score: {score}</h2>
-                                    <p>Matched {len(user_sessions[session_token].matched_keywords)} {'keyword' if len(user_sessions[session_token].matched_keywords) == 1 else 'keywords'} out of {len(job.keywords)} {'keyword' if len(job.keywords) == 1 else 'keywords'}.</p>
+                                    <p>Matched {len(user.matched_keywords)} {'keyword' if len(user.matched_keywords) == 1 else 'keywords'} out of {len(job.keywords)} {'keyword' if len(job.keywords) == 1 else 'keywords'}.</p>
                                 </div>
                                 <div id="suggestion-container" hx-swap-oob="true">
                                     <div class="reword-prompt">
@@ -407,15 +537,16 @@ async def confirm(confirm_answer: str = Form(), session_token: str = Cookie(None
                 httponly = True,
                 )
             
+            await user_sessions.save(session_token, user)
             return response
 
     #if the user wouldn't like to keep the reworded bullet, return the html without the reword and reprompt with the next keyword
     elif confirm_answer == "No":
         #if this is not the last keyword in the list
-        if user_sessions[session_token].unmatched_keywords:
-            first_keyword_prompt = user_sessions[session_token].unmatched_keywords[0]
+        if user.unmatched_keywords:
+            first_keyword_prompt = user.unmatched_keywords[0]
             response = HTMLResponse(f"""
-                                    {user_sessions[session_token].resume_html}
+                                    {user.resume_html}
                                     <div id="suggestion-container" hx-swap-oob="true">
                                         <div class="reword-prompt">
                                             Have you encountered the keyword "{first_keyword_prompt}" in your experiences?
@@ -444,11 +575,12 @@ async def confirm(confirm_answer: str = Form(), session_token: str = Cookie(None
                 httponly = True,
                 )
             
+            await user_sessions.save(session_token, user)
             return response
         #if this is the last keyword in the list
         else:
             response = HTMLResponse(f"""
-                                {user_sessions[session_token].resume_html}
+                                {user.resume_html}
                                 <div id="suggestion-container" hx-swap-oob="true">
                                     <div class="reword-prompt">
                                         No more unmatched keywords detected. Please either continue to edit resume below or export.
@@ -462,16 +594,71 @@ async def confirm(confirm_answer: str = Form(), session_token: str = Cookie(None
                 httponly = True,
                 )
             
+            await user_sessions.save(session_token, user)
             return response
 
 
+#runs the CPU-bound job description stages in one go so it can be handed to the parse pool
+def process_job_description(job_description_text: str) -> Job:
+    job = Job()
+    #remove common words, spaces, bullets, etc
+    job.plaintext = clean_text(job_description_text)
+    #extract only the important words from the job description text
+    job.keywords = extract_keywords_and_phrases(job.plaintext)
+    #fill in job.html with job description and wrap keywords in span element
+    return parse_job(job)
+
+
+#error responses carrying this header are meant for the user, templates/index.html swaps them in instead of dropping them
+SWAP_ERROR_HEADER = "X-Swap-Error"
+
+
+#returned when the parse pool is full, the page swaps it in and the user can resubmit
+def busy_response() -> HTMLResponse:
+    return HTMLResponse(
+        """
+        <div class="reword-prompt">
+            The server is busy processing other documents. Please try again in a few seconds.
+        </div>
+        """,
+        status_code=503,
+        headers={"Retry-After": "5", SWAP_ERROR_HEADER: "true"},
+    )
+
+
+#returned for uploads that are not processed, the page swaps the message in so the user can pick another file
+def rejected_response(message: str, status_code: int = 422) -> HTMLResponse:
+    return HTMLResponse(
+        f"""
+        <div class="reword-prompt">
+            {html.escape(message)}
+        </div>
+        """,
+        status_code=status_code,
+        headers={SWAP_ERROR_HEADER: "true"},
+    )
+
+
+def upload_too_large_response() -> HTMLResponse:
+    return rejected_response(f"This file is larger than {MAX_UPLOAD_BYTES / (1024 * 1024):.1f} MB. Please upload a smaller PDF.", 413)
+
+
+#stores the (bullet text, offsets, embeddings) from index_bullets on the session and drops any pending reword
+def set_bullets(user: User, bullets: tuple):
+    user.bullet_text, user.bullet_offsets, user.bullet_embeddings = bullets
+    user.reworded_bullet_index = -1
+    user.reworded_bullet = ""
+
+
 #takes in the session_id from the cookie
-#if there is no session_id(no cookie either), creates session ID, assigns it to the cookie and creates a user in user_sessions with the uuid acting as the key
-def handle_cookie(session_token: str = None, user_sessions: dict = None) -> str:
+#if there is no session_id(no cookie either), creates session ID, assigns it to the cookie and creates a user with the uuid acting as the key
+#the user is loaded from the session backend, handlers save it back with user_sessions.save before responding
+async def handle_cookie(session_token: str = None) -> tuple[str, User]:
 
-    #checks if there is no session token or if the session token has not been assigned to a user yet
-    if not session_token or session_token not in user_sessions:
+    #checks if there is a session token and if it has been assigned to a user yet
+    user = await user_sessions.load(session_token) if session_token else None
+    if user is None:
         session_token = str(uuid.uuid4())
-        user_sessions[session_token] = User()
+        user = User()
     
-    return session_token
\ No newline at end of file
+    return session_token, user
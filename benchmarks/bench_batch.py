@@ -0,0 +1,50 @@
+"""
+Throughput benchmark for extract_keywords_batch.
+
+Scores a corpus of resumes serially with extract_keywords_and_phrases, then through
+extract_keywords_batch with an increasing number of processes, and checks the output is unchanged.
+
+Run from the repo root:
+    python -m benchmarks.bench_batch [--docs 200] [--batch-size 16]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from parse.parse_plaintext import extract_keywords_and_phrases, extract_keywords_batch
+
+SAMPLE_RESUME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_resume.txt')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--docs', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=16)
+    args = parser.parse_args()
+
+    with open(SAMPLE_RESUME, encoding='utf-8') as f:
+        text = f.read()
+
+    #vary the documents slightly so nothing downstream can short circuit on identical input
+    texts = [f"{text}\nReference {i}" for i in range(args.docs)]
+
+    start = time.perf_counter()
+    serial = [extract_keywords_and_phrases(t) for t in texts]
+    serial_s = time.perf_counter() - start
+    print(f"{'serial':<14} {serial_s:7.2f} s  {args.docs / serial_s:7.1f} docs/s")
+
+    cores = os.cpu_count() or 1
+    process_counts = sorted({1, 2, 4, cores} & set(range(1, cores + 1)))
+    for n_process in process_counts:
+        start = time.perf_counter()
+        batched = extract_keywords_batch(texts, n_process=n_process, batch_size=args.batch_size)
+        batch_s = time.perf_counter() - start
+        identical = 'same' if batched == serial else 'DIFFERS'
+        print(f"{f'n_process={n_process}':<14} {batch_s:7.2f} s  {args.docs / batch_s:7.1f} docs/s  "
+              f"{serial_s / batch_s:5.2f}x  {identical}")
+
+
+if __name__ == '__main__':
+    main()
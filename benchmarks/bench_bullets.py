@@ -0,0 +1,92 @@
+"""
+Benchmark of bullet ranking in reword/reword.py.
+
+Compares the old loop (one forward pass per bullet, re-encoding the keyword every time) with
+rank_bullets (one batched encode and a single matrix-vector product) on resumes with 50+ bullets,
+and with rank_bullets on embeddings precomputed at upload, and checks they pick the same best bullet.
+
+Run from the repo root:
+    python -m benchmarks.bench_bullets [--bullets 50 100 200] [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from embed.embed import get_model
+from embed.embed import encode
+from reword.reword import rank_bullets
+
+SAMPLE_RESUME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_resume.txt')
+
+KEYWORDS = ['process control', 'hazop', 'python', 'heat transfer', 'six sigma']
+
+
+def per_bullet_best(keyword: str, bullets: list) -> str:
+    """
+    The ranking get_best_bullet used before batching: two encodes per bullet.
+    """
+    model = get_model()
+    best_score = 0
+    best_bullet = ''
+    for bullet in bullets:
+        if bullet.strip() == '':
+            continue
+        bullet_embedding = model.encode(bullet)
+        keyword_embedding = model.encode(keyword)
+        similarity = np.dot(bullet_embedding, keyword_embedding) / (
+            np.linalg.norm(bullet_embedding) * np.linalg.norm(keyword_embedding))
+        if similarity * 100 > best_score:
+            best_score = similarity * 100
+            best_bullet = bullet
+    return best_bullet
+
+
+def make_bullets(count: int) -> list:
+    with open(SAMPLE_RESUME, encoding='utf-8') as f:
+        base = [line.strip().lstrip('•').strip() for line in f if line.strip().startswith('•')]
+
+    #number the repeats so every bullet is a distinct string, like a long CV with similar roles
+    return [f"{base[i % len(base)]} ({i // len(base) + 1})" for i in range(count)]
+
+
+def timed(func, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--bullets', type=int, nargs='+', default=[50, 100, 200])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    #load the model and fill the keyword store before timing anything
+    get_model()
+    rank_bullets(KEYWORDS[0], make_bullets(4))
+
+    print(f"{'bullets':>8} {'per-bullet ms':>14} {'batched ms':>11} {'speedup':>8} {'precomputed ms':>15}  best bullet")
+    for count in args.bullets:
+        bullets = make_bullets(count)
+
+        old_s = timed(lambda: [per_bullet_best(keyword, bullets) for keyword in KEYWORDS], args.runs) / len(KEYWORDS)
+        new_s = timed(lambda: [rank_bullets(keyword, bullets, 3) for keyword in KEYWORDS], args.runs) / len(KEYWORDS)
+
+        #what a reword costs once the bullets were embedded at upload time
+        embeddings = encode(bullets)
+        precomputed_s = timed(lambda: [rank_bullets(keyword, bullets, 3, embeddings) for keyword in KEYWORDS], args.runs) / len(KEYWORDS)
+
+        same = all(per_bullet_best(keyword, bullets) == rank_bullets(keyword, bullets, 1)[0][1] for keyword in KEYWORDS)
+        print(f"{count:8d} {old_s * 1000:14.1f} {new_s * 1000:11.1f} {old_s / new_s:7.1f}x {precomputed_s * 1000:15.2f}  {'same' if same else 'DIFFERS'}")
+
+
+if __name__ == '__main__':
+    main()
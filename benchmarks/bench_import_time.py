@@ -0,0 +1,83 @@
+"""
+Import-time budget for the web tier.
+
+Imports app.py in a fresh interpreter under `python -X importtime`, reports the total and the slowest
+modules, and exits non-zero if the import takes longer than the budget or pulls in any of the heavy
+dependencies that are supposed to load lazily (spaCy, torch, sentence-transformers, openai, bs4, PyPDF2).
+Meant to run in CI as a regression check.
+
+Run from the repo root:
+    python -m benchmarks.bench_import_time [--budget-ms 1500] [--runs 3] [--top 15]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#top level packages that must not be imported just by importing app.py
+LAZY_MODULES = ['spacy', 'en_core_web_sm', 'torch', 'sentence_transformers', 'transformers', 'openai', 'bs4', 'PyPDF2']
+
+
+def import_app() -> dict:
+    """
+    Import app in a child interpreter and return {module: (self us, cumulative us)} from -X importtime.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        raise SystemExit(f'importing app failed with exit code {result.returncode}')
+
+    #lines look like "import time:       412 |       1804 |   app", nested imports are indented
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        modules[fields[2].strip()] = (int(fields[0]), int(fields[1]))
+
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--budget-ms', type=float, default=1500)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    runs = [import_app() for _ in range(args.runs)]
+    totals = [modules['app'][1] / 1000 for modules in runs]
+    total_ms = statistics.median(totals)
+
+    modules = runs[-1]
+    print(f"{'module':<50} {'self ms':>9} {'cumulative ms':>14}")
+    for name, (self_us, cumulative_us) in sorted(modules.items(), key=lambda item: -item[1][0])[:args.top]:
+        print(f"{name:<50} {self_us / 1000:9.1f} {cumulative_us / 1000:14.1f}")
+    print(f"\nimport app: {total_ms:.0f} ms median over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+
+    failures = []
+    eager = sorted({name.split('.')[0] for name in modules} & set(LAZY_MODULES))
+    if eager:
+        failures.append(f"heavy modules imported eagerly: {', '.join(eager)}")
+    if total_ms > args.budget_ms:
+        failures.append(f"import took {total_ms:.0f} ms, over the {args.budget_ms:.0f} ms budget")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == '__main__':
+    main()
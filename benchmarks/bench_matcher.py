@@ -0,0 +1,98 @@
+"""
+Micro-benchmark for extract_keywords_and_phrases.
+
+Compares the old behaviour (compile a new PhraseMatcher from keywords.eng_keywords on every call)
+with the shared matcher from parse.keyword_matcher on a typical resume, then compares cold-start
+matcher construction from keywords.py against the precompiled artifact.
+
+Run from the repo root:
+    python -m benchmarks.bench_matcher [--runs 50]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from parse import parse_plaintext
+from parse import keyword_matcher
+from spacy.matcher import PhraseMatcher
+import keywords
+
+SAMPLE_RESUME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_resume.txt')
+
+
+def build_matcher_uncached(nlp) -> PhraseMatcher:
+    """
+    The matcher construction extract_keywords_and_phrases used to run on every call.
+    """
+    phrase_matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+    phrase_matcher.add("eng_keywords", [nlp.make_doc(phrase) for phrase in keywords.eng_keywords])
+    return phrase_matcher
+
+
+def time_calls(text: str, runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        parse_plaintext.extract_keywords_and_phrases(text)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label: str, timings: list):
+    print(f"{label:<28} mean {statistics.mean(timings):8.2f} ms   "
+          f"median {statistics.median(timings):8.2f} ms   "
+          f"min {min(timings):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=50)
+    args = parser.parse_args()
+
+    with open(SAMPLE_RESUME, encoding='utf-8') as f:
+        text = f.read()
+
+    #warm up spacy itself so neither side pays for first-call allocation
+    parse_plaintext.extract_keywords_and_phrases(text)
+
+    #before: force a fresh compile on every call, which is what the old code did
+    original_get = parse_plaintext.get_phrase_matcher
+    parse_plaintext.get_phrase_matcher = build_matcher_uncached
+    try:
+        before = time_calls(text, args.runs)
+    finally:
+        parse_plaintext.get_phrase_matcher = original_get
+
+    #after: shared matcher, compiled once
+    keyword_matcher.reset_phrase_matcher()
+    start = time.perf_counter()
+    keyword_matcher.get_phrase_matcher(parse_plaintext.nlp)
+    compile_ms = (time.perf_counter() - start) * 1000
+    after = time_calls(text, args.runs)
+
+    print(f"resume length: {len(text)} chars, {args.runs} runs each")
+    print(f"one-time matcher compile: {compile_ms:.2f} ms")
+    report("rebuild matcher per call", before)
+    report("shared matcher", after)
+    print(f"speedup (median): {statistics.median(before) / statistics.median(after):.1f}x")
+
+    #cold start: compiling from keywords.py versus loading the precompiled artifact
+    start = time.perf_counter()
+    build_matcher_uncached(parse_plaintext.nlp)
+    compile_ms = (time.perf_counter() - start) * 1000
+    print(f"cold start, compile from keywords.py: {compile_ms:.2f} ms")
+
+    if keyword_matcher.load_artifact(parse_plaintext.nlp) is None:
+        print("cold start, artifact: no fresh artifact, run `python -m parse.keyword_matcher` first")
+    else:
+        start = time.perf_counter()
+        keyword_matcher.build_phrase_matcher(parse_plaintext.nlp)
+        artifact_ms = (time.perf_counter() - start) * 1000
+        print(f"cold start, load artifact:            {artifact_ms:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
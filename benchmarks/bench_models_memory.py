@@ -0,0 +1,110 @@
+"""
+Memory held by 1,000 resident sessions with keywords as lists of dicts versus KeywordTable.
+
+Builds the same sessions twice under tracemalloc: once with the per-keyword dicts extract_keywords_and_phrases
+used to return (own snippet string and form_count dict per keyword, a dict index), once with the columnar
+KeywordTable and KeywordIndex. Keywords are the keywords.eng_keywords phrases found in sample_resume.txt,
+and each session has its own text, as separate uploads would. The texts themselves are allocated before
+measuring, so the numbers are what the models add on top of the plaintext.
+
+Run from the repo root:
+    python -m benchmarks.bench_models_memory [--sessions 1000]
+"""
+import argparse
+import gc
+import os
+import re
+import sys
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from keywords import eng_keywords
+from models import User, KeywordTable
+from parse.parse_plaintext import strip_span
+
+SAMPLE_RESUME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_resume.txt')
+SNIPPET_LENGTH = 40
+
+
+def find_keywords(text: str) -> list:
+    """
+    (keyword, count, snippet start, snippet end) for every eng_keywords phrase in text, like the phrase matcher finds them.
+    """
+    lowered = text.lower()
+    found = []
+    for phrase in eng_keywords:
+        starts = [m.start() for m in re.finditer(r'\b' + re.escape(phrase.lower()) + r'\b', lowered)]
+        if starts:
+            start, end = strip_span(text, max(0, starts[0] - SNIPPET_LENGTH), min(len(text), starts[0] + SNIPPET_LENGTH))
+            found.append((phrase.lower(), len(starts), start, end))
+    return found
+
+
+def fresh(text: str) -> str:
+    """
+    A new string equal to text. spaCy hands out new strings for every span, so no two sessions shared them.
+    """
+    return text.encode('utf-8').decode('utf-8')
+
+
+def dict_session(text: str, found: list) -> User:
+    user = User()
+    user.resume.plaintext = text
+    keywords = []
+    for keyword, count, start, end in found:
+        lemma = fresh(keyword)
+        keywords.append({'lemma': lemma, 'display_form': fresh(keyword), 'count': count, 'snippet': text[start:end],
+                         'form_count': {fresh(keyword): count}})
+    user.resume.keywords = keywords
+    user.resume.keyword_index = {entry['lemma']: entry for entry in keywords}
+    user.job.plaintext = text[:1500]
+    user.job.keywords = [{**entry, 'snippet': fresh(entry['snippet']), 'form_count': dict(entry['form_count'])}
+                         for entry in keywords[:len(keywords) // 2]]
+    return user
+
+
+def table_session(text: str, found: list) -> User:
+    user = User()
+    user.resume.plaintext = text
+    keywords = KeywordTable(text)
+    for keyword, count, start, end in found:
+        keywords.append(keyword, keyword, count, start, end, {keyword: count})
+    user.resume.keywords = keywords
+    user.resume.keyword_index = keywords.index()
+    user.job.plaintext = text[:1500]
+    user.job.keywords = KeywordTable.from_entries(keywords[:len(keywords) // 2], text)
+    return user
+
+
+def measure(build, texts: list, found: list) -> int:
+    gc.collect()
+    tracemalloc.start()
+    sessions = [build(text, found) for text in texts]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del sessions
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sessions', type=int, default=1000)
+    args = parser.parse_args()
+
+    with open(SAMPLE_RESUME, encoding='utf-8') as f:
+        text = f.read()
+
+    found = find_keywords(text)
+    texts = [f"{text}\nReference {i}" for i in range(args.sessions)]
+
+    print(f"{len(found)} resume keywords per session, {args.sessions} sessions")
+    print(f"{'layout':<14} {'MiB total':>10} {'KiB/session':>12}")
+    sizes = {}
+    for name, build in (('dict lists', dict_session), ('KeywordTable', table_session)):
+        sizes[name] = measure(build, texts, found)
+        print(f"{name:<14} {sizes[name] / 2**20:10.2f} {sizes[name] / args.sessions / 1024:12.2f}")
+    print(f"\nKeywordTable sessions use {sizes['KeywordTable'] / sizes['dict lists']:.0%} of the memory")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark of serial versus page-parallel PDF text extraction in parse/parse_plaintext.py.
+
+Extracts 1, 5 and 30 page versions of the sample resume (benchmarks/pdf_fixture.py) serially and through
+the spawned process pool, and checks both give the same text. The pool is started before timing, as it
+is in a running server after the first large upload.
+
+Run from the repo root:
+    python -m benchmarks.bench_pdf_extraction [--pages 1 5 30] [--workers 4] [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def timed(func, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 5, 30])
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    #config is read at import time, so the pool size has to be set first
+    workers = max(2, args.workers)
+    os.environ['PDF_PARALLEL_WORKERS'] = str(workers)
+    from parse.parse_plaintext import get_text_from_pdf
+    from workers.workers import get_process_executor, shutdown_process_pool
+    from benchmarks.pdf_fixture import sample_resume_pdf
+
+    start = time.perf_counter()
+    executor = get_process_executor()
+    list(executor.map(abs, range(workers)))
+    print(f"process pool start: {(time.perf_counter() - start) * 1000:.1f} ms, {workers} workers on {os.cpu_count()} cores")
+
+    print(f"{'pages':>5} {'serial ms':>10} {'parallel ms':>12} {'speedup':>8}  output")
+    try:
+        for page_count in args.pages:
+            pdf = sample_resume_pdf(page_count)
+            serial = get_text_from_pdf(pdf, min_parallel_pages=0)
+            parallel = get_text_from_pdf(pdf, min_parallel_pages=1)
+
+            serial_ms = timed(lambda: get_text_from_pdf(pdf, min_parallel_pages=0), args.runs)
+            parallel_ms = timed(lambda: get_text_from_pdf(pdf, min_parallel_pages=1), args.runs)
+            identical = 'same' if serial == parallel else 'DIFFERS'
+            print(f"{page_count:5d} {serial_ms:10.1f} {parallel_ms:12.1f} {serial_ms / parallel_ms:7.2f}x  {identical}")
+    finally:
+        shutdown_process_pool()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+End-to-end benchmark of the app against the local fake OpenAI server, no network needed.
+
+Starts benchmarks/fake_openai.py on a free port, points the shared OpenAI client at it, then drives
+upload -> job description -> reword -> confirm through the ASGI app with concurrent simulated users.
+
+Run from the repo root:
+    python -m benchmarks.bench_pipeline [--users 20] [--concurrency 5] [--latency-ms 300]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+JOB_DESCRIPTION = (
+    "Process Engineer. We are looking for a chemical engineer with experience in process design, "
+    "process simulation using Aspen Plus, HAZOP and process safety, root cause analysis, six sigma, "
+    "heat transfer, distillation and Python. Experience with P&ID, PFD and DCS is a plus."
+)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'fake OpenAI server did not start on port {port}')
+
+
+async def run_user(client, pdf: bytes, timings: dict, user: int):
+    """
+    One simulated user walking through the whole flow, each with their own cookie jar.
+    """
+    client.cookies.clear()
+
+    steps = [
+        ('home', lambda: client.get('/')),
+        #vary the bytes per user so the resume cache does not turn every upload after the first into a hit
+        ('upload', lambda: client.post('/handle-resume-file', files={'resume_file': ('resume.pdf', pdf + b'%' + str(user).encode(), 'application/pdf')})),
+        ('job', lambda: client.post('/handle-job-description', data={'job_description_text': JOB_DESCRIPTION})),
+        ('reword', lambda: client.post('/reword', data={'reword_answer': 'Yes', 'keyword': 'aspen plus'})),
+        ('confirm', lambda: client.post('/confirm', data={'confirm_answer': 'Yes'})),
+    ]
+
+    for name, request in steps:
+        start = time.perf_counter()
+        response = await request()
+        timings.setdefault(name, []).append(time.perf_counter() - start)
+        if response.status_code != 200:
+            timings.setdefault('errors', []).append(f'{name}: {response.status_code}')
+            return
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=5)
+    parser.add_argument('--latency-ms', type=float, default=300)
+    parser.add_argument('--error-rate', type=float, default=0)
+    args = parser.parse_args()
+
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.fake_openai', '--port', str(port),
+         '--latency-ms', str(args.latency_ms), '--error-rate', str(args.error_rate)],
+        cwd=ROOT,
+    )
+    try:
+        wait_for_port(port)
+
+        #config is read at import, so the environment has to be set before the app is imported
+        os.environ['OPENAI_BASE_URL'] = f'http://127.0.0.1:{port}/v1'
+        os.environ['OPEN_AI_KEY'] = 'fake'
+        os.environ['LLM_CACHE_PATH'] = ''
+
+        import httpx
+        from app import app
+        from benchmarks.pdf_fixture import sample_resume_pdf
+
+        pdf = sample_resume_pdf(1)
+        timings = {}
+        slots = asyncio.Semaphore(args.concurrency)
+
+        async def limited(user: int):
+            async with slots:
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=120) as client:
+                    await run_user(client, pdf, timings, user)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(limited(user) for user in range(args.users)))
+        total = time.perf_counter() - start
+
+        print(f"{args.users} users, concurrency {args.concurrency}, fake OpenAI latency {args.latency_ms:.0f} ms")
+        print(f"{'step':<10} {'median ms':>10} {'p95 ms':>10} {'max ms':>10}")
+        for name, values in timings.items():
+            if name == 'errors':
+                continue
+            values = sorted(values)
+            p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+            print(f"{name:<10} {statistics.median(values) * 1000:10.1f} {p95 * 1000:10.1f} {values[-1] * 1000:10.1f}")
+        print(f"total {total:.2f} s, {args.users / total:.2f} users/s")
+        for error in timings.get('errors', []):
+            print(f"error: {error}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""
+Benchmark for the spaCy extraction profiles in parse/parse_plaintext.py.
+
+Each profile runs in its own subprocess so load time and peak RSS are measured per worker.
+The keyword output of every profile is compared against the "full" pipeline.
+
+Run from the repo root:
+    python -m benchmarks.bench_profile [--runs 30]
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_RESUME = os.path.join(ROOT, 'benchmarks', 'sample_resume.txt')
+
+
+def run_child(profile: str, runs: int):
+    """
+    Load the pipeline for one profile, time extraction and print a json result line.
+    """
+    os.environ['EXTRACTION_PROFILE'] = profile
+    sys.path.append(ROOT)
+
+    start = time.perf_counter()
+    from parse import parse_plaintext
+    parse_plaintext.get_nlp()
+    load_ms = (time.perf_counter() - start) * 1000
+
+    with open(SAMPLE_RESUME, encoding='utf-8') as f:
+        text = f.read()
+
+    keywords = parse_plaintext.extract_keywords_and_phrases(text)
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        parse_plaintext.extract_keywords_and_phrases(text)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    print(json.dumps({
+        'profile': profile,
+        'pipeline': parse_plaintext.nlp.pipe_names,
+        'load_ms': load_ms,
+        'median_ms': statistics.median(timings),
+        #ru_maxrss is reported in kilobytes on linux
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'keywords': keywords.to_list(),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=30)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.runs)
+        return
+
+    sys.path.append(ROOT)
+    from parse.parse_plaintext import NLP_PROFILES
+
+    results = {}
+    for profile in NLP_PROFILES:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', profile, '--runs', str(args.runs)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout
+        results[profile] = json.loads(output.strip().splitlines()[-1])
+
+    baseline = results['full']
+    print(f"{'profile':<10} {'load ms':>9} {'median ms':>10} {'max rss MB':>11}  output   pipeline")
+    for profile, result in results.items():
+        identical = 'same' if result['keywords'] == baseline['keywords'] else 'DIFFERS'
+        print(f"{profile:<10} {result['load_ms']:9.1f} {result['median_ms']:10.2f} {result['max_rss_mb']:11.1f}  "
+              f"{identical:<8} {', '.join(result['pipeline'])}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark of the exact-match first pass in score/score.py.
+
+Compares the old nested loop (every job keyword scanned against every resume keyword) with the
+lemma index lookup, on synthetic keyword lists shaped like extract_keywords_and_phrases output, and checks
+score_resume handles a job description scored before any resume was uploaded.
+
+Run from the repo root:
+    python -m benchmarks.bench_score [--job-keywords 2000] [--resume-keywords 2000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models import KeywordTable, User
+from score.score import build_keyword_index, match_keywords, score_resume
+
+
+def make_keywords(lemmas: list) -> KeywordTable:
+    table = KeywordTable()
+    for i, lemma in enumerate(lemmas):
+        table.append(lemma, lemma, 1 + i % 3, 0, 0, {lemma: 1})
+    return table
+
+
+def nested_loop_match(job_keywords: list, resume_keywords: list) -> tuple[dict, list]:
+    """
+    The first pass score_resume used before the index: O(J x R), over the old lists of keyword dicts.
+    """
+    matched_job_keywords = {}
+    unmatched_job_keywords = []
+    for job_entry in job_keywords:
+        matched = False
+        for resume_entry in resume_keywords:
+            if job_entry['lemma'] == resume_entry['lemma']:
+                if job_entry['lemma'] not in matched_job_keywords.keys():
+                    matched_job_keywords[job_entry['lemma']] = 1
+                    matched = True
+                break
+        if not matched:
+            unmatched_job_keywords.append(job_entry)
+    return matched_job_keywords, unmatched_job_keywords
+
+
+def timed(func, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--job-keywords', type=int, default=2000)
+    parser.add_argument('--resume-keywords', type=int, default=2000)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    #half of the job keywords appear in the resume
+    rng = random.Random(0)
+    vocabulary = [f'keyword {i}' for i in range(args.job_keywords + args.resume_keywords)]
+    resume_lemmas = rng.sample(vocabulary, args.resume_keywords)
+    job_lemmas = rng.sample(resume_lemmas, min(args.job_keywords // 2, len(resume_lemmas)))
+    job_lemmas += rng.sample([v for v in vocabulary if v not in set(resume_lemmas)], args.job_keywords - len(job_lemmas))
+
+    resume_keywords = make_keywords(resume_lemmas)
+    job_keywords = make_keywords(job_lemmas)
+
+    job_list, resume_list = job_keywords.to_list(), resume_keywords.to_list()
+    old_ms = timed(lambda: nested_loop_match(job_list, resume_list), args.runs)
+    index_ms = timed(lambda: build_keyword_index(resume_keywords), args.runs)
+    keyword_index = build_keyword_index(resume_keywords)
+    new_ms = timed(lambda: match_keywords(job_keywords, keyword_index), args.runs)
+
+    old_matched, _ = nested_loop_match(job_list, resume_list)
+    new_matched, _ = match_keywords(job_keywords, keyword_index)
+    same = 'same' if old_matched.keys() == new_matched.keys() else 'DIFFERS'
+
+    print(f"{args.job_keywords} job keywords x {args.resume_keywords} resume keywords, median of {args.runs} runs")
+    print(f"nested loop:          {old_ms:9.2f} ms")
+    print(f"build index (once):   {index_ms:9.2f} ms")
+    print(f"index lookup:         {new_ms:9.2f} ms   matches {same}")
+    print(f"speedup per score:    {old_ms / new_ms:9.1f}x")
+
+    #a job description submitted before any resume was uploaded (or after the session expired) has no index to match against
+    user = User()
+    user.job.keywords = job_keywords
+    asyncio.run(score_resume(user))
+    no_resume = 'ok' if not user.matched_keywords and user.resume.keyword_index is not None else 'WRONG'
+    print(f"no resume uploaded:   {len(user.matched_keywords)} of {len(job_keywords)} job keywords matched, {no_resume}")
+
+
+if __name__ == '__main__':
+    main()
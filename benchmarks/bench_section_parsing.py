@@ -0,0 +1,67 @@
+"""
+Benchmark of the two section parsing modes (SECTION_PARSE_MODE) in parse/parse_plaintext.py.
+
+Parses the sample resume in "per_section" and "combined" mode and reports OpenAI calls,
+prompt/completion tokens and wall-clock latency per resume.
+Needs OPEN_AI_KEY, or OPENAI_BASE_URL pointing at a compatible local server.
+
+Run from the repo root:
+    python -m benchmarks.bench_section_parsing [--runs 3]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+#measure real calls, not local response cache hits
+os.environ['LLM_CACHE_PATH'] = ''
+from models import Resume
+from parse import parse_plaintext
+from llm.client import usage_stats
+
+SAMPLE_RESUME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_resume.txt')
+
+
+async def run_mode(mode: str, text: str, runs: int) -> dict:
+    parse_plaintext.SECTION_PARSE_MODE = mode
+    before = usage_stats()
+
+    timings = []
+    for _ in range(runs):
+        resume = Resume()
+        resume.plaintext = text
+        sections = await parse_plaintext.extract_section_headers(resume)
+
+        start = time.perf_counter()
+        await parse_plaintext.extract_sections(sections, resume)
+        timings.append(time.perf_counter() - start)
+
+    after = usage_stats()
+    return {
+        'calls': (after['calls'] - before['calls']) / runs,
+        'prompt_tokens': (after['prompt_tokens'] - before['prompt_tokens']) / runs,
+        'completion_tokens': (after['completion_tokens'] - before['completion_tokens']) / runs,
+        'median_s': statistics.median(timings),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    with open(SAMPLE_RESUME, encoding='utf-8') as f:
+        text = f.read()
+
+    print(f"{'mode':<12} {'calls':>6} {'prompt tok':>11} {'completion tok':>15} {'median s':>9}")
+    for mode in ('per_section', 'combined'):
+        result = await run_mode(mode, text, args.runs)
+        print(f"{mode:<12} {result['calls']:6.1f} {result['prompt_tokens']:11.0f} "
+              f"{result['completion_tokens']:15.0f} {result['median_s']:9.2f}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+"""
+Size and speed of User.to_bytes / User.from_bytes against pickle and JSON.
+
+Encodes and decodes the realistic session from bench_sessions.make_user with each format and reports the
+payload size and median encode/decode time, and checks to_bytes round-trips the session unchanged.
+
+Run from the repo root:
+    python -m benchmarks.bench_serialization [--runs 200]
+"""
+import argparse
+import dataclasses
+import json
+import os
+import pickle
+import statistics
+import sys
+import time
+import zlib
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import models
+from models import User, Resume, Job, KeywordTable, KeywordIndex
+from benchmarks.bench_sessions import make_user
+
+
+def to_json(value):
+    """
+    json.dumps default hook: models become their field dicts, keyword tables the old lists of dicts and arrays nested lists.
+    """
+    if isinstance(value, (User, Resume, Job)):
+        return {field.name: getattr(value, field.name) for field in dataclasses.fields(value)}
+    if isinstance(value, KeywordTable):
+        return value.to_list()
+    if isinstance(value, KeywordIndex):
+        return None
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"cannot encode {type(value).__name__}")
+
+
+def timed(func, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def same_session(a: User, b: User) -> bool:
+    arrays = all(
+        (x is None and y is None) or (x is not None and y is not None and np.array_equal(x, y) and x.dtype == y.dtype)
+        for x, y in ((a.bullet_offsets, b.bullet_offsets), (a.bullet_embeddings, b.bullet_embeddings))
+    )
+    fields = ('resume_html', 'resume_html_new', 'matched_keywords', 'unmatched_keywords', 'current_keyword',
+              'bullet_text', 'reworded_bullet_index', 'reworded_bullet')
+    return (arrays and all(getattr(a, field) == getattr(b, field) for field in fields)
+            and a.resume == b.resume and a.job == b.job)
+
+
+def to_bytes_with(user: User, zstandard) -> bytes:
+    """
+    user.to_bytes() with zstd compression switched on (zstandard module) or off (None).
+    """
+    installed = models.zstandard
+    models.zstandard = zstandard
+    try:
+        return user.to_bytes()
+    finally:
+        models.zstandard = installed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=200)
+    args = parser.parse_args()
+
+    user = make_user()
+
+    formats = {
+        'pickle': (lambda: pickle.dumps(user, protocol=pickle.HIGHEST_PROTOCOL), pickle.loads),
+        'pickle+zlib': (lambda: zlib.compress(pickle.dumps(user, protocol=pickle.HIGHEST_PROTOCOL), 1),
+                        lambda data: pickle.loads(zlib.decompress(data))),
+        'json': (lambda: json.dumps(user, default=to_json).encode('utf-8'), lambda data: json.loads(data)),
+    }
+
+    #to_bytes with each codec available here
+    codecs = [('to_bytes+zlib', None)]
+    if models.zstandard is not None:
+        codecs.append(('to_bytes+zstd', models.zstandard))
+    for name, module in codecs:
+        formats[name] = (lambda module=module: to_bytes_with(user, module), User.from_bytes)
+
+    print(f"{'format':<15} {'bytes':>9} {'encode us':>10} {'decode us':>10}")
+    for name, (encode, decode) in formats.items():
+        data = encode()
+        encode_s = timed(encode, args.runs)
+        decode_s = timed(lambda: decode(data), args.runs)
+        print(f"{name:<15} {len(data):9d} {encode_s * 1e6:10.1f} {decode_s * 1e6:10.1f}")
+
+    round_trip = User.from_bytes(user.to_bytes())
+    print(f"\nto_bytes round trip: {'same' if same_session(user, round_trip) else 'DIFFERS'}")
+
+
+if __name__ == '__main__':
+    main()
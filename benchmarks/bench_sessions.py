@@ -0,0 +1,119 @@
+"""
+Benchmark of the session backends in sessions/backends.py.
+
+Saves and loads a realistic session (resume text and html, keyword lists, bullet embeddings) through the
+memory, SQLite and Redis backends, the last against benchmarks/fake_redis.py. It also checks that a session
+saved by one backend instance loads in a second one, the way a request handled by another worker would.
+
+Run from the repo root:
+    python -m benchmarks.bench_sessions [--sessions 500]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from models import User, KeywordTable
+from sessions.backends import MemorySessionBackend, SQLiteSessionBackend, RedisSessionBackend, dump_user
+from sessions.sessions import SessionStore
+from benchmarks.bench_pipeline import free_port, wait_for_port
+
+SAMPLE_RESUME = os.path.join(ROOT, 'benchmarks', 'sample_resume.txt')
+
+
+def make_user() -> User:
+    """
+    A session as it looks after upload, job description and scoring.
+    """
+    with open(SAMPLE_RESUME, encoding='utf-8') as f:
+        text = f.read()
+
+    words = sorted(set(text.lower().split()))
+    keywords = KeywordTable(text)
+    for i, word in enumerate(words):
+        keywords.append(word, word, 1 + i % 3, i, i + 80, {word: 1 + i % 3})
+    bullets = [line.strip().lstrip('•').strip() for line in text.splitlines() if line.strip().startswith('•')]
+
+    user = User()
+    user.resume.plaintext = text
+    user.resume.keywords = keywords
+    user.resume.keyword_index = keywords.index()
+    user.resume_html = '<div class="resume">' + ''.join(f'<div class="section-content">{line}</div>' for line in text.splitlines()) + '</div>'
+    user.job.plaintext = text[:1500]
+    user.job.keywords = KeywordTable.from_entries(keywords[:80], user.job.plaintext)
+    user.job.html = '<div>' + user.job.plaintext + '</div>'
+    user.matched_keywords = {lemma: 1 for lemma in words[:40]}
+    user.unmatched_keywords = words[40:80]
+    user.bullet_text = ''.join(bullets)
+    user.bullet_offsets = np.cumsum([0] + [len(bullet) for bullet in bullets]).astype(np.int32)
+    user.bullet_embeddings = np.random.default_rng(0).standard_normal((len(bullets), 384)).astype(np.float32)
+    return user
+
+
+async def run_backend(name: str, backend, other, user: User, sessions: int):
+    tokens = [f'bench-{i}' for i in range(sessions)]
+
+    save_times = []
+    for token in tokens:
+        start = time.perf_counter()
+        await backend.save(token, user)
+        save_times.append(time.perf_counter() - start)
+
+    load_times = []
+    for token in tokens:
+        start = time.perf_counter()
+        loaded = await backend.load(token)
+        load_times.append(time.perf_counter() - start)
+    assert loaded is not None
+
+    #a second instance stands in for another worker process
+    shared = 'n/a'
+    if other is not None:
+        shared = 'yes' if await other.load(tokens[0]) is not None else 'NO'
+
+    print(f"{name:<8} {statistics.median(save_times) * 1000:10.3f} {statistics.median(load_times) * 1000:10.3f} {shared:>14}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sessions', type=int, default=500)
+    args = parser.parse_args()
+
+    user = make_user()
+    print(f"serialized session: {len(dump_user(user)) / 1024:.1f} KiB")
+    print(f"{'backend':<8} {'save ms':>10} {'load ms':>10} {'other worker':>14}")
+
+    memory = MemorySessionBackend(SessionStore(args.sessions))
+    await run_backend('memory', memory, None, user, args.sessions)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'sessions.sqlite3')
+        sqlite, other = SQLiteSessionBackend(path, args.sessions, 3600), SQLiteSessionBackend(path, args.sessions, 3600)
+        await run_backend('sqlite', sqlite, other, user, args.sessions)
+        await sqlite.close()
+        await other.close()
+
+    port = free_port()
+    server = subprocess.Popen([sys.executable, '-m', 'benchmarks.fake_redis', '--port', str(port)], cwd=ROOT)
+    try:
+        wait_for_port(port)
+        url = f'redis://127.0.0.1:{port}/0'
+        redis, other = RedisSessionBackend(url, 3600), RedisSessionBackend(url, 3600)
+        await run_backend('redis', redis, other, user, args.sessions)
+        await redis.close()
+        await other.close()
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,209 @@
+"""
+Local stand-in for the OpenAI chat-completions API, for load testing and offline benchmarks.
+
+Recognises the prompts sent by parse/parse_sections.py, score/score.py and reword/reword.py and
+answers with canned, deterministic JSON, with optional latency and error injection.
+
+Run from the repo root:
+    python -m benchmarks.fake_openai --port 8100 --latency-ms 400 --jitter-ms 100 --error-rate 0.02
+
+Then point the app at it:
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPEN_AI_KEY=fake uvicorn app:app
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import re
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+#injection settings, overridable by the command line or environment so the server can run under plain uvicorn too
+settings = {
+    'latency_ms': float(os.getenv('FAKE_OPENAI_LATENCY_MS', 0)),
+    'jitter_ms': float(os.getenv('FAKE_OPENAI_JITTER_MS', 0)),
+    'error_rate': float(os.getenv('FAKE_OPENAI_ERROR_RATE', 0)),
+    'error_status': int(os.getenv('FAKE_OPENAI_ERROR_STATUS', 500)),
+    'seed': int(os.getenv('FAKE_OPENAI_SEED', 0)),
+}
+
+_random = random.Random(settings['seed'])
+_ids = itertools.count(1)
+
+EDUCATION_ENTRIES = [
+    {
+        "degree": "B.S.E. Chemical Engineering & B.S. Chemistry",
+        "school": "University of Michigan",
+        "location": "Ann Arbor, MI",
+        "duration": "Aug 2021 – May 2025",
+        "content": "GPA: 3.90 / 4.00 | Capstone: Production of Light Olefins from Methanol | Dean's List",
+    }
+]
+
+EXPERIENCE_ENTRIES = [
+    {
+        "title": "Process Engineering Intern",
+        "company": "Dow Chemical",
+        "location": "Midland, MI",
+        "duration": "May 2024 - Aug 2024",
+        "content": "• Developed process control strategies for a distillation column using Aspen Plus\n"
+                   "• Led a HAZOP review with operations and safety teams\n"
+                   "• Built Python scripts to automate data analysis of DCS historian data",
+    },
+    {
+        "title": "Research Assistant",
+        "company": "University of Michigan",
+        "location": "Ann Arbor, MI",
+        "duration": "Jan 2023 - Apr 2024",
+        "content": "• Conducted laboratory experiments on polymer synthesis and reaction kinetics\n"
+                   "• Analyzed data using Python, MATLAB and Excel",
+    },
+]
+
+PROJECTS_ENTRIES = [
+    {
+        "project": "Production of Light Olefins from Methanol",
+        "location": "Ann Arbor, MI",
+        "affiliation": "University of Michigan",
+        "duration": "Jan 2025 - Apr 2025",
+        "content": "• Designed and simulated a methanol-to-olefins production process using Aspen Plus\n"
+                   "• Performed equipment sizing, cost estimation and economic analysis",
+    }
+]
+
+CANNED_ENTRIES = {
+    'education': EDUCATION_ENTRIES,
+    'experience': EXPERIENCE_ENTRIES,
+    'projects': PROJECTS_ENTRIES,
+}
+
+
+def _lemmas(line: str) -> list:
+    return re.findall(r"'lemma': '([^']*)'", line)
+
+
+def match_keywords(prompt: str) -> str:
+    """
+    Deterministic stand-in for catch_keywords: match a job keyword to a resume keyword sharing a word with it.
+    """
+    job_line = next((line for line in prompt.splitlines() if line.startswith('Job Keywords')), '')
+    resume_line = next((line for line in prompt.splitlines() if line.startswith('Resume Keywords')), '')
+    resume_lemmas = _lemmas(resume_line)
+
+    matches = []
+    for job_lemma in _lemmas(job_line):
+        job_words = set(job_lemma.split())
+        for resume_lemma in resume_lemmas:
+            if job_words & set(resume_lemma.split()):
+                matches.append({"job_keyword": job_lemma, "resume_keyword": resume_lemma})
+                break
+
+    return json.dumps(matches)
+
+
+def reword(prompt: str) -> str:
+    original = re.search(r'Original bullet point:\n(.*?)\n\nKeyword to incorporate: (.*?)\n', prompt, re.S)
+    if not original:
+        return "Reworded bullet point"
+    bullet, keyword = original.group(1).strip(), original.group(2).strip()
+    return f"{bullet.rstrip('.')}, applying {keyword}"
+
+
+def combined_sections(prompt: str) -> str:
+    section_types = re.findall(r'SECTION (\d+) \(type: (\w+),', prompt)
+    return json.dumps({number: CANNED_ENTRIES.get(section_type, []) for number, section_type in section_types})
+
+
+def answer(messages: list) -> str:
+    """
+    Pick a canned answer from the prompt text.
+    """
+    prompt = "\n".join(message.get('content') or '' for message in messages)
+
+    if 'analyzing several sections of a resume' in prompt:
+        return combined_sections(prompt)
+    if "resume's education section" in prompt:
+        return json.dumps(EDUCATION_ENTRIES)
+    if "resume's work experience section" in prompt:
+        return json.dumps(EXPERIENCE_ENTRIES)
+    if "projects/research section" in prompt:
+        return json.dumps(PROJECTS_ENTRIES)
+    if 'keyword matching assistant' in prompt:
+        return match_keywords(prompt)
+    if 'Reworded bullet point' in prompt:
+        return reword(prompt)
+    return "[]"
+
+
+app = FastAPI()
+
+
+@app.get("/v1/models")
+async def models():
+    return {"object": "list", "data": [{"id": "gpt-3.5-turbo", "object": "model"}, {"id": "gpt-4o-mini", "object": "model"}]}
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+
+    delay = settings['latency_ms'] + _random.uniform(-settings['jitter_ms'], settings['jitter_ms'])
+    if delay > 0:
+        await asyncio.sleep(delay / 1000)
+
+    if settings['error_rate'] and _random.random() < settings['error_rate']:
+        status = settings['error_status']
+        return JSONResponse(
+            {"error": {"message": "Injected failure from fake OpenAI server", "type": "server_error", "code": status}},
+            status_code=status,
+        )
+
+    messages = body.get('messages', [])
+    content = answer(messages)
+    prompt_tokens = sum(len(message.get('content') or '') for message in messages) // 4
+    completion_tokens = len(content) // 4
+
+    return {
+        "id": f"chatcmpl-fake-{next(_ids)}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get('model', 'gpt-3.5-turbo'),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8100)
+    parser.add_argument('--latency-ms', type=float, default=settings['latency_ms'])
+    parser.add_argument('--jitter-ms', type=float, default=settings['jitter_ms'])
+    parser.add_argument('--error-rate', type=float, default=settings['error_rate'])
+    parser.add_argument('--error-status', type=int, default=settings['error_status'])
+    parser.add_argument('--seed', type=int, default=settings['seed'])
+    args = parser.parse_args()
+
+    settings.update(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                    error_status=args.error_status, seed=args.seed)
+    _random.seed(args.seed)
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
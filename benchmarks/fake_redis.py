@@ -0,0 +1,159 @@
+"""
+Local stand-in for Redis, speaking enough of the RESP protocol for the session backend in sessions/backends.py.
+
+Supports PING, HELLO (RESP2 and RESP3), GET, SET (with EX/PX), DEL, EXISTS, EXPIRE, TTL, DBSIZE, FLUSHDB, SELECT and CLIENT, with keys
+held in memory and expired lazily. Lets the Redis session backend be tested and benchmarked without a Redis server.
+
+Run from the repo root:
+    python -m benchmarks.fake_redis --port 6380
+
+Then point the app at it:
+    SESSION_BACKEND=redis SESSION_REDIS_URL=redis://127.0.0.1:6380/0 uvicorn app:app --workers 4
+"""
+import argparse
+import asyncio
+import time
+
+#key -> (value, expires_at), expires_at is None for keys without a ttl
+_data = {}
+
+
+def _live(key: bytes):
+    entry = _data.get(key)
+    if entry is None:
+        return None
+    value, expires_at = entry
+    if expires_at is not None and expires_at <= time.monotonic():
+        del _data[key]
+        return None
+    return entry
+
+
+def _bulk(value: bytes | None, proto: int = 2) -> bytes:
+    if value is None:
+        return b'_\r\n' if proto == 3 else b'$-1\r\n'
+    return b'$%d\r\n%s\r\n' % (len(value), value)
+
+
+def _int(value: int) -> bytes:
+    return b':%d\r\n' % value
+
+
+def _hello(args: list, connection: dict) -> bytes:
+    proto = int(args[1]) if len(args) > 1 else connection['proto']
+    if proto not in (2, 3):
+        return b'-NOPROTO unsupported protocol version\r\n'
+    connection['proto'] = proto
+
+    fields = [b'server', b'redis', b'version', b'7.0.0', b'proto', proto, b'id', 1, b'mode', b'standalone', b'role', b'master']
+    body = b''.join(_int(field) if isinstance(field, int) else _bulk(field) for field in fields)
+    body += _bulk(b'modules') + b'*0\r\n'
+    #RESP3 replies with a map of the pairs, RESP2 with a flat array
+    if proto == 3:
+        return b'%%%d\r\n%s' % (len(fields) // 2 + 1, body)
+    return b'*%d\r\n%s' % (len(fields) + 2, body)
+
+
+def execute(args: list, connection: dict) -> bytes:
+    command = args[0].upper()
+    proto = connection['proto']
+
+    if command == b'PING':
+        return _bulk(args[1]) if len(args) > 1 else b'+PONG\r\n'
+    if command == b'HELLO':
+        return _hello(args, connection)
+    if command in (b'SELECT', b'CLIENT'):
+        return b'+OK\r\n'
+    if command == b'GET':
+        entry = _live(args[1])
+        return _bulk(entry[0] if entry else None, proto)
+    if command == b'SET':
+        expires_at = None
+        options = [arg.upper() for arg in args[3:]]
+        for i, option in enumerate(options):
+            if option == b'EX':
+                expires_at = time.monotonic() + int(args[3 + i + 1])
+            elif option == b'PX':
+                expires_at = time.monotonic() + int(args[3 + i + 1]) / 1000
+        _data[args[1]] = (args[2], expires_at)
+        return b'+OK\r\n'
+    if command == b'DEL':
+        removed = 0
+        for key in args[1:]:
+            if _live(key) is not None:
+                del _data[key]
+                removed += 1
+        return _int(removed)
+    if command == b'EXISTS':
+        return _int(sum(1 for key in args[1:] if _live(key) is not None))
+    if command == b'EXPIRE':
+        entry = _live(args[1])
+        if entry is None:
+            return _int(0)
+        _data[args[1]] = (entry[0], time.monotonic() + int(args[2]))
+        return _int(1)
+    if command == b'TTL':
+        entry = _live(args[1])
+        if entry is None:
+            return _int(-2)
+        return _int(-1 if entry[1] is None else int(entry[1] - time.monotonic()))
+    if command == b'DBSIZE':
+        return _int(sum(1 for key in list(_data) if _live(key) is not None))
+    if command == b'FLUSHDB':
+        _data.clear()
+        return b'+OK\r\n'
+
+    return b"-ERR unknown command '%s'\r\n" % command
+
+
+async def read_command(reader: asyncio.StreamReader) -> list | None:
+    """
+    Read one command, sent as an array of bulk strings.
+    """
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b'*'):
+        #inline command, e.g. typed into telnet
+        return line.split()
+
+    args = []
+    for _ in range(int(line[1:])):
+        length = int((await reader.readline())[1:])
+        args.append((await reader.readexactly(length + 2))[:-2])
+    return args
+
+
+async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    #protocol version negotiated by HELLO, per connection
+    connection = {'proto': 2}
+    try:
+        while True:
+            args = await read_command(reader)
+            if not args:
+                break
+            writer.write(execute(args, connection))
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host: str, port: int):
+    server = await asyncio.start_server(handle, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6380)
+    args = parser.parse_args()
+
+    asyncio.run(serve(args.host, args.port))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Builds small text-only PDFs for the benchmarks without any PDF library.
+"""
+import os
+
+SAMPLE_RESUME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_resume.txt')
+
+LINES_PER_PAGE = 60
+
+
+def _escape(line: str) -> bytes:
+    #WinAnsiEncoding covers the bullets and dashes used in resumes
+    data = line.encode('cp1252', errors='replace')
+    return data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def make_pdf(pages: list) -> bytes:
+    """
+    Build a PDF with one page per entry in pages, each entry being a list of text lines.
+    """
+    objects = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog_id = add(b'')
+    pages_id = add(b'')
+    font_id = add(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>')
+
+    page_ids = []
+    for lines in pages:
+        stream = b'BT /F1 10 Tf 12 TL 50 760 Td\n'
+        stream += b''.join(b'(' + _escape(line) + b") '\n" for line in lines)
+        stream += b'ET'
+        content_id = add(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+        page_ids.append(add(
+            b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] '
+            b'/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>' % (pages_id, font_id, content_id)
+        ))
+
+    objects[catalog_id - 1] = b'<< /Type /Catalog /Pages %d 0 R >>' % pages_id
+    kids = b' '.join(b'%d 0 R' % page_id for page_id in page_ids)
+    objects[pages_id - 1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(page_ids))
+
+    output = b'%PDF-1.4\n'
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+
+    xref_offset = len(output)
+    output += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    output += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    output += b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, catalog_id, xref_offset)
+
+    return output
+
+
+def sample_resume_pdf(page_count: int = 1) -> bytes:
+    """
+    The sample resume laid out over page_count pages, repeating its lines to fill longer documents.
+    """
+    with open(SAMPLE_RESUME, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+
+    needed = page_count * LINES_PER_PAGE
+    if page_count > 1:
+        lines = (lines * (needed // len(lines) + 1))[:needed]
+
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)][:page_count]
+    return make_pdf(pages)
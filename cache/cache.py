@@ -0,0 +1,172 @@
+import copy
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache():
+    """
+    Bounded least-recently-used cache with optional expiry and an optional on-disk tier.
+
+    Values are deep copied on the way in and out so callers can mutate what they get back
+    without changing the cached copy. Entries older than ttl seconds are dropped (ttl=0 keeps them
+    until evicted). When disk_dir is set, every entry is also pickled to disk_dir/<key>.pkl and
+    memory misses are served from there, with at most disk_max_entries files kept.
+    """
+    def __init__(self, max_entries: int, disk_dir: str = "", disk_max_entries: int = 4096, ttl: float = 0):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.disk_max_entries = disk_max_entries
+        self.ttl = ttl
+        #key -> (expires_at, value), expires_at is None when there is no ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                expires_at, value = self._entries[key]
+                if expires_at is None or expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(value)
+
+                del self._entries[key]
+                self.expirations += 1
+
+        entry = self._read_disk(key)
+        if entry is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        #promote disk hits back into memory, keeping their original expiry
+        expires_at, value = entry
+        self._put_memory(key, value, expires_at)
+        with self._lock:
+            self.hits += 1
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value):
+        value = copy.deepcopy(value)
+        expires_at = time.time() + self.ttl if self.ttl else None
+        self._put_memory(key, value, expires_at)
+        self._write_disk(key, value, expires_at)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+    def _put_memory(self, key: str, value, expires_at):
+        if self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f'{key}.pkl')
+
+    def _read_disk(self, key: str):
+        if not self.disk_dir:
+            return None
+
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+            expires_at, value = entry['expires_at'], entry['value']
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error reading cache entry {path}: {e}")
+            return None
+
+        if expires_at is not None and expires_at <= time.time():
+            with self._lock:
+                self.expirations += 1
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+        #touch the file so disk eviction treats it as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return expires_at, value
+
+    def _write_disk(self, key: str, value, expires_at):
+        if not self.disk_dir:
+            return
+
+        path = self._disk_path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'expires_at': expires_at, 'value': value}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error writing cache entry {path}: {e}")
+            return
+
+        self._evict_disk()
+
+    def _evict_disk(self):
+        try:
+            files = [entry for entry in os.scandir(self.disk_dir) if entry.name.endswith('.pkl')]
+        except OSError:
+            return
+
+        if len(files) <= self.disk_max_entries:
+            return
+
+        #least recently written or read first
+        files.sort(key=_mtime)
+        for entry in files[:len(files) - self.disk_max_entries]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+def _mtime(entry) -> float:
+    #another worker may remove the file between scandir and stat
+    try:
+        return entry.stat().st_mtime
+    except OSError:
+        return 0
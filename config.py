@@ -0,0 +1,86 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+#spaCy pipeline profile used for keyword extraction, see parse/parse_plaintext.py NLP_PROFILES
+#"keywords" keeps only what extract_keywords_and_phrases reads (tokens and lemmas), "full" loads every component
+EXTRACTION_PROFILE = os.getenv('EXTRACTION_PROFILE', 'keywords')
+
+#bounded pool that runs CPU-bound parsing (PDF text extraction, spaCy) off the asyncio event loop
+#requests beyond PARSE_POOL_WORKERS running + PARSE_POOL_QUEUE_DEPTH waiting are turned away with a 503
+PARSE_POOL_WORKERS = int(os.getenv('PARSE_POOL_WORKERS', min(4, os.cpu_count() or 1)))
+PARSE_POOL_QUEUE_DEPTH = int(os.getenv('PARSE_POOL_QUEUE_DEPTH', 16))
+
+#PDFs with at least PDF_PARALLEL_MIN_PAGES pages are split into page ranges extracted across PDF_PARALLEL_WORKERS
+#spawned processes, smaller ones are extracted serially on the calling thread; 0 always extracts serially
+PDF_PARALLEL_MIN_PAGES = int(os.getenv('PDF_PARALLEL_MIN_PAGES', 8))
+PDF_PARALLEL_WORKERS = int(os.getenv('PDF_PARALLEL_WORKERS', min(4, os.cpu_count() or 1)))
+
+#resume uploads over MAX_UPLOAD_BYTES are rejected with a 413, from Content-Length before the body is read when the client sends it
+#PDFs over PDF_MAX_PAGES pages or still extracting after PDF_EXTRACT_TIMEOUT seconds are rejected with a 422 (0 disables either cap)
+MAX_UPLOAD_BYTES = int(os.getenv('MAX_UPLOAD_BYTES', 5 * 1024 * 1024))
+PDF_MAX_PAGES = int(os.getenv('PDF_MAX_PAGES', 40))
+PDF_EXTRACT_TIMEOUT = float(os.getenv('PDF_EXTRACT_TIMEOUT', 20))
+
+#cache of parsed resumes keyed by the sha256 of the uploaded PDF
+#RESUME_CACHE_DIR enables an on-disk tier that survives restarts and is shared by workers on the same host
+RESUME_CACHE_SIZE = int(os.getenv('RESUME_CACHE_SIZE', 256))
+RESUME_CACHE_DIR = os.getenv('RESUME_CACHE_DIR', '')
+RESUME_CACHE_DISK_SIZE = int(os.getenv('RESUME_CACHE_DISK_SIZE', 4096))
+
+#cross-session cache of processed job descriptions keyed by the cleaned job description text
+JOB_CACHE_SIZE = int(os.getenv('JOB_CACHE_SIZE', 1024))
+JOB_CACHE_TTL = int(os.getenv('JOB_CACHE_TTL', 3600))
+
+#concurrent OpenAI section parsing calls (education, experience, projects) per resume and per process
+SECTION_PARSE_CONCURRENCY = int(os.getenv('SECTION_PARSE_CONCURRENCY', 3))
+SECTION_PARSE_GLOBAL_CONCURRENCY = int(os.getenv('SECTION_PARSE_GLOBAL_CONCURRENCY', 16))
+
+#"per_section" sends each education/experience/projects section as its own OpenAI request,
+#"combined" sends them all in one request with a combined JSON schema
+SECTION_PARSE_MODE = os.getenv('SECTION_PARSE_MODE', 'per_section')
+
+#local cache of OpenAI responses, keyed on model + temperature + prompt; set LLM_CACHE_PATH empty to disable
+LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH', '.cache/llm_responses.sqlite3')
+LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', 20000))
+LLM_CACHE_TTL = int(os.getenv('LLM_CACHE_TTL', 7 * 24 * 3600))
+
+#shared OpenAI client used by every call site, see llm/client.py
+OPENAI_API_KEY = os.getenv('OPEN_AI_KEY')
+#point at any chat-completions compatible server, e.g. the local stand-in in benchmarks/fake_openai.py
+OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL', '')
+OPENAI_TIMEOUT = float(os.getenv('OPENAI_TIMEOUT', 60))
+OPENAI_MAX_CONNECTIONS = int(os.getenv('OPENAI_MAX_CONNECTIONS', 20))
+OPENAI_MAX_CONCURRENCY = int(os.getenv('OPENAI_MAX_CONCURRENCY', 8))
+OPENAI_REQUESTS_PER_MINUTE = int(os.getenv('OPENAI_REQUESTS_PER_MINUTE', 500))
+OPENAI_TOKENS_PER_MINUTE = int(os.getenv('OPENAI_TOKENS_PER_MINUTE', 200000))
+OPENAI_MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', 4))
+
+#local semantic keyword matching (all-MiniLM-L6-v2 cosine similarity) for job keywords without an exact lemma match
+#scores >= SEMANTIC_MATCH_THRESHOLD are matches, scores in [SEMANTIC_BORDERLINE_THRESHOLD, SEMANTIC_MATCH_THRESHOLD)
+#are borderline and are sent to OpenAI for a second opinion when SEMANTIC_LLM_FALLBACK is on
+SEMANTIC_MATCH_THRESHOLD = float(os.getenv('SEMANTIC_MATCH_THRESHOLD', 0.75))
+SEMANTIC_BORDERLINE_THRESHOLD = float(os.getenv('SEMANTIC_BORDERLINE_THRESHOLD', 0.6))
+SEMANTIC_LLM_FALLBACK = os.getenv('SEMANTIC_LLM_FALLBACK', '1').lower() in ('1', 'true', 'yes')
+
+#keyword embeddings encoded at runtime and kept in memory, on top of the precomputed matrix built by `python -m embed.store`
+KEYWORD_EMBEDDING_CACHE_SIZE = int(os.getenv('KEYWORD_EMBEDDING_CACHE_SIZE', 50000))
+
+#resources loaded by the FastAPI lifespan hook before /ready reports the worker ready, in a comma separated list
+#any of nlp, matcher, embeddings, inference (a dummy request through spaCy and the sentence-transformer); empty skips warm-up
+WARMUP_STEPS = [step.strip() for step in os.getenv('WARMUP_STEPS', 'nlp,matcher,embeddings,inference').split(',') if step.strip()]
+
+#in-process session store, see sessions/sessions.py; idle sessions expire to match the 24h session cookie
+#SESSION_MAX_BYTES caps the estimated memory held by sessions (0 = only the entry count is capped)
+SESSION_MAX_ENTRIES = int(os.getenv('SESSION_MAX_ENTRIES', 10000))
+SESSION_IDLE_TTL = int(os.getenv('SESSION_IDLE_TTL', 86400))
+SESSION_MAX_BYTES = int(os.getenv('SESSION_MAX_BYTES', 512 * 1024 * 1024))
+SESSION_SWEEP_INTERVAL = float(os.getenv('SESSION_SWEEP_INTERVAL', 60))
+
+#where sessions live, see sessions/backends.py: "memory" (this process only), "sqlite" (shared by the workers on one host)
+#or "redis" (shared by every container); sqlite and redis let uvicorn --workers N serve any step of a session
+SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'memory')
+SESSION_SQLITE_PATH = os.getenv('SESSION_SQLITE_PATH', '.cache/sessions.sqlite3')
+SESSION_REDIS_URL = os.getenv('SESSION_REDIS_URL', 'redis://127.0.0.1:6379/0')
+SESSION_REDIS_PREFIX = os.getenv('SESSION_REDIS_PREFIX', 'session:')
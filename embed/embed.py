@@ -0,0 +1,43 @@
+import threading
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+#sentence_transformers pulls in torch, so it is only imported when the model is first loaded
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+
+# Lazy load the model only when needed (avoid slow startup)
+model = None
+_model_lock = threading.Lock()
+
+
+def get_model() -> "SentenceTransformer":
+    global model
+    if model is None:
+        #parse pool threads can ask for the model at the same time, only one of them loads it
+        with _model_lock:
+            if model is None:
+                from sentence_transformers import SentenceTransformer
+
+                model = SentenceTransformer(MODEL_NAME)
+    return model
+
+
+def encode(texts: list, batch_size: int = 64) -> np.ndarray:
+    """
+    Embed texts in batches and return a float32 matrix of unit length rows,
+    so cosine similarity between two sets is a plain matrix product.
+    """
+    if not texts:
+        return np.zeros((0, get_model().get_sentence_embedding_dimension()), dtype=np.float32)
+
+    return get_model().encode(
+        list(texts),
+        batch_size=batch_size,
+        normalize_embeddings=True,
+        convert_to_numpy=True,
+        show_progress_bar=False,
+    ).astype(np.float32, copy=False)
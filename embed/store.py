@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from embed.embed import MODEL_NAME, encode
+from config import KEYWORD_EMBEDDING_CACHE_SIZE
+
+#precomputed embeddings written by `python -m embed.store`
+#the matrix is float16 and memory mapped, so every worker on the host shares the same pages
+MATRIX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'keyword_embeddings.npy')
+INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'keyword_embeddings.json')
+
+_INDEX_VERSION = 1
+
+
+def normalize_term(term: str) -> str:
+    """
+    Lookup key for a keyword: lowercased with runs of whitespace collapsed.
+    """
+    return ' '.join(term.lower().split())
+
+
+def _terms_fingerprint(terms: list) -> str:
+    digest = hashlib.sha256()
+    digest.update(MODEL_NAME.encode('utf-8'))
+    digest.update('\n'.join(terms).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class KeywordEmbeddingStore():
+    """
+    Process-wide store of keyword embeddings keyed by normalized lemma.
+
+    Lookups check a bounded in-memory LRU of terms encoded at runtime, then the memory mapped
+    matrix precomputed for keywords.eng_keywords. Only terms found in neither are sent to the model,
+    in one batch. All vectors are float32 and unit length.
+    """
+    def __init__(self, max_entries: int, matrix_path: str = MATRIX_PATH, index_path: str = INDEX_PATH):
+        self.max_entries = max_entries
+        self.matrix_path = matrix_path
+        self.index_path = index_path
+        #term -> vector for terms that are not in the precomputed matrix
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        #term -> row of the precomputed matrix, loaded on first lookup
+        self._rows = None
+        self._matrix = None
+
+        self.hits = 0
+        self.precomputed_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load_precomputed(self):
+        """
+        Memory map the precomputed matrix. Missing or stale files leave the store empty, terms are then encoded on demand.
+        """
+        self._rows = {}
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                index = json.load(f)
+            matrix = np.load(self.matrix_path, mmap_mode='r')
+        except (OSError, ValueError):
+            return
+
+        terms = index.get('terms', [])
+        if (index.get('version') != _INDEX_VERSION or index.get('model') != MODEL_NAME
+                or index.get('fingerprint') != _terms_fingerprint(terms) or matrix.shape[0] != len(terms)):
+            print(f'Keyword embeddings {self.matrix_path} are stale, encoding keywords on demand')
+            return
+
+        self._matrix = matrix
+        self._rows = {term: row for row, term in enumerate(terms)}
+
+    def get_many(self, terms: list) -> np.ndarray:
+        """
+        Return a float32 matrix with one unit length row per term, encoding only the terms never seen before.
+        """
+        keys = [normalize_term(term) for term in terms]
+        vectors = [None] * len(keys)
+        missing = {}
+
+        with self._lock:
+            if self._rows is None:
+                self._load_precomputed()
+
+            for position, key in enumerate(keys):
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    vectors[position] = self._entries[key]
+                    self.hits += 1
+                elif key in self._rows:
+                    vectors[position] = self._matrix[self._rows[key]]
+                    self.precomputed_hits += 1
+                else:
+                    missing.setdefault(key, []).append(position)
+
+            self.misses += len(missing)
+
+        if missing:
+            #encode outside the lock so lookups from other threads are not held up by the model
+            encoded = encode(list(missing))
+            with self._lock:
+                for key, vector in zip(missing, encoded):
+                    for position in missing[key]:
+                        vectors[position] = vector
+                    self._entries[key] = vector
+                    self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+        if not vectors:
+            return encode([])
+        return np.asarray(np.stack(vectors), dtype=np.float32)
+
+    def get(self, term: str) -> np.ndarray:
+        return self.get_many([term])[0]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.precomputed_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'precomputed': len(self._rows or {}),
+                'hits': self.hits,
+                'precomputed_hits': self.precomputed_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round((self.hits + self.precomputed_hits) / lookups, 3) if lookups else 0,
+            }
+
+
+def write_precomputed(terms: list, matrix_path: str = MATRIX_PATH, index_path: str = INDEX_PATH) -> int:
+    """
+    Encode terms and write the float16 matrix and its index. Returns the number of terms written.
+    """
+    terms = list(dict.fromkeys(normalize_term(term) for term in terms if term.strip()))
+    matrix = encode(terms).astype(np.float16)
+
+    #write to temp files first so a worker starting mid-build never maps a half written matrix
+    #np.save appends .npy to names without it, so the temp name keeps the extension
+    tmp_matrix_path = f'{matrix_path}.tmp.npy'
+    tmp_index_path = f'{index_path}.tmp'
+    np.save(tmp_matrix_path, matrix)
+    with open(tmp_index_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'version': _INDEX_VERSION,
+            'model': MODEL_NAME,
+            'fingerprint': _terms_fingerprint(terms),
+            'terms': terms,
+        }, f)
+    os.replace(tmp_matrix_path, matrix_path)
+    os.replace(tmp_index_path, index_path)
+
+    return len(terms)
+
+
+store = KeywordEmbeddingStore(KEYWORD_EMBEDDING_CACHE_SIZE)
+
+
+if __name__ == '__main__':
+    #build step: python -m embed.store, run after python -m parse.keyword_matcher so the lemmas come from its artifact
+    from parse.parse_plaintext import get_nlp
+    from parse.keyword_matcher import get_keyword_patterns
+
+    lemmas = get_keyword_patterns(get_nlp())[1]
+    count = write_precomputed(lemmas)
+    print(f'Wrote {count} keyword embeddings to {MATRIX_PATH}')
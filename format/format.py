@@ -2,11 +2,15 @@ from fastapi.responses import HTMLResponse
 from models import Resume
 from parse.parse_plaintext import extract_contact_info, extract_section_headers, extract_sections
 
+#returned when formatting fails
+FORMAT_ERROR_HTML = "<h1>Error processing resume</h1><p>Check console for details.</p>"
 
-async def format_resume(text: str, resume: Resume) -> HTMLResponse:
+
+async def format_resume(text: str, resume: Resume) -> tuple[HTMLResponse, bool]:
     """
     Format resume text into a structured HTML layout with editable sections.
     Clean version with contact information extraction.
+    Also returns whether every section was parsed, failed or partial results must not be cached.
     """
     try:
         #extract contact information
@@ -20,7 +24,7 @@ async def format_resume(text: str, resume: Resume) -> HTMLResponse:
         #REMEMBER
         #TO
         #PUT THIS BACK IN AHHHHHH!!!!!
-        await extract_sections(sections, resume)
+        sections_complete = await extract_sections(sections, resume)
 
 
 
@@ -94,11 +98,11 @@ async def format_resume(text: str, resume: Resume) -> HTMLResponse:
         """
 
 
-        return HTMLResponse(html_content)
+        return HTMLResponse(html_content), sections_complete
         
     except Exception as e:
         print(f"Error in format_resume: {e}")
         import traceback
         traceback.print_exc()
-        return HTMLResponse("<h1>Error processing resume</h1><p>Check console for details.</p>")
+        return HTMLResponse(FORMAT_ERROR_HTML), False
 
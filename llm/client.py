@@ -0,0 +1,229 @@
+import asyncio
+import random
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from config import (OPENAI_API_KEY, OPENAI_BASE_URL, OPENAI_TIMEOUT, OPENAI_MAX_CONNECTIONS, OPENAI_MAX_CONCURRENCY,
+                    OPENAI_REQUESTS_PER_MINUTE, OPENAI_TOKENS_PER_MINUTE, OPENAI_MAX_RETRIES)
+from llm.cache import get_cache, cache_key
+
+#the openai SDK (and httpx under it) is imported when the first call is made, not when this module is imported
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+#rough prompt size estimate (characters per token) and completion allowance used to charge the token bucket
+#before a call, the bucket is corrected with the real usage once the response arrives
+_CHARS_PER_TOKEN = 4
+_COMPLETION_TOKEN_ESTIMATE = 500
+
+_BACKOFF_BASE = 0.5
+_BACKOFF_CAP = 20
+
+
+class _TokenBucket():
+    """
+    Refills continuously at per_minute / 60 units per second up to per_minute.
+    """
+    def __init__(self, per_minute: int):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        self._refill()
+        #a single request larger than the whole bucket only has to wait for a full bucket
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= amount
+
+
+class RateLimiter():
+    """
+    Process-wide limit on OpenAI calls: at most max_concurrency in flight,
+    and requests/tokens per minute enforced with token buckets.
+    """
+    def __init__(self, max_concurrency: int, requests_per_minute: int, tokens_per_minute: int):
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._lock = asyncio.Lock()
+        self._requests = _TokenBucket(requests_per_minute)
+        self._tokens = _TokenBucket(tokens_per_minute)
+
+    async def acquire(self, tokens: int):
+        await self._slots.acquire()
+        try:
+            #one waiter at a time so callers are served in order instead of racing for refills
+            async with self._lock:
+                while True:
+                    wait = max(self._requests.wait_time(1), self._tokens.wait_time(tokens))
+                    if wait <= 0:
+                        break
+                    await asyncio.sleep(wait)
+                self._requests.take(1)
+                self._tokens.take(tokens)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self):
+        self._slots.release()
+
+    def adjust_tokens(self, difference: int):
+        #charge (or refund) the difference between the estimate and the real token usage
+        self._tokens.take(difference)
+
+
+limiter = RateLimiter(OPENAI_MAX_CONCURRENCY, OPENAI_REQUESTS_PER_MINUTE, OPENAI_TOKENS_PER_MINUTE)
+
+_client = None
+_client_lock = threading.Lock()
+
+_stats = {
+    'calls': 0,
+    'cache_hits': 0,
+    'retries': 0,
+    'errors': 0,
+    'prompt_tokens': 0,
+    'completion_tokens': 0,
+}
+
+
+def get_client() -> "AsyncOpenAI":
+    """
+    The one AsyncOpenAI client for the process, sharing a single pooled HTTP connection pool.
+    Retries are handled by chat_completion so the SDK's own retry loop is turned off.
+    """
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import httpx
+                from openai import AsyncOpenAI
+
+                _client = AsyncOpenAI(
+                    api_key=OPENAI_API_KEY,
+                    base_url=OPENAI_BASE_URL or None,
+                    timeout=OPENAI_TIMEOUT,
+                    max_retries=0,
+                    http_client=httpx.AsyncClient(
+                        limits=httpx.Limits(
+                            max_connections=OPENAI_MAX_CONNECTIONS,
+                            max_keepalive_connections=OPENAI_MAX_CONNECTIONS,
+                        ),
+                        timeout=OPENAI_TIMEOUT,
+                    ),
+                )
+
+    return _client
+
+
+def usage_stats() -> dict:
+    return dict(_stats)
+
+
+def _estimate_tokens(request: dict) -> int:
+    prompt_chars = sum(len(message.get('content') or '') for message in request.get('messages', []))
+    return prompt_chars // _CHARS_PER_TOKEN + request.get('max_tokens', _COMPLETION_TOKEN_ESTIMATE)
+
+
+def _is_retryable(error: Exception) -> bool:
+    from openai import APIStatusError, APIConnectionError, APITimeoutError
+
+    if isinstance(error, (APIConnectionError, APITimeoutError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    from openai import APIStatusError
+
+    #honour the server's retry-after when it sends one, otherwise exponential backoff with full jitter
+    if isinstance(error, APIStatusError):
+        retry_after = error.response.headers.get('retry-after')
+        try:
+            if retry_after is not None:
+                return min(_BACKOFF_CAP, float(retry_after)) + random.uniform(0, _BACKOFF_BASE)
+        except ValueError:
+            pass
+    return random.uniform(0, min(_BACKOFF_CAP, _BACKOFF_BASE * 2 ** attempt))
+
+
+async def chat_completion(cache: bool = False, validate=None, **request) -> str:
+    """
+    Run a chat completion through the shared client and return the message content.
+
+    Every call goes through the process-wide rate limiter and is retried with jittered backoff on
+    429, 5xx and connection errors. Responses are only served from and stored in the local response
+    cache (llm/cache.py) when the call site opts in with cache=True, since most prompts are sampled
+    with a non-zero temperature. If validate is given, a response is only stored when validate(response)
+    does not raise, so malformed model output is never replayed.
+    """
+    store = get_cache() if cache else None
+
+    if store is not None:
+        key = cache_key(**request)
+        try:
+            cached = await asyncio.to_thread(store.get, key)
+        except sqlite3.Error as e:
+            print(f"Error reading LLM cache: {e}")
+            cached = None
+        if cached is not None:
+            _stats['cache_hits'] += 1
+            return cached
+
+    estimated_tokens = _estimate_tokens(request)
+
+    attempt = 0
+    while True:
+        await limiter.acquire(estimated_tokens)
+        try:
+            _stats['calls'] += 1
+            completion = await get_client().chat.completions.create(**request)
+            break
+        except Exception as e:
+            if not _is_retryable(e) or attempt >= OPENAI_MAX_RETRIES:
+                _stats['errors'] += 1
+                raise
+            delay = _retry_delay(e, attempt)
+            print(f"OpenAI call failed ({e.__class__.__name__}), retrying in {delay:.1f}s")
+        finally:
+            limiter.release()
+
+        _stats['retries'] += 1
+        attempt += 1
+        await asyncio.sleep(delay)
+
+    if completion.usage:
+        _stats['prompt_tokens'] += completion.usage.prompt_tokens
+        _stats['completion_tokens'] += completion.usage.completion_tokens
+        limiter.adjust_tokens(completion.usage.total_tokens - estimated_tokens)
+
+    response = completion.choices[0].message.content
+
+    if store is not None and response is not None:
+        try:
+            if validate is not None:
+                validate(response)
+            await asyncio.to_thread(store.set, key, response)
+        except sqlite3.Error as e:
+            print(f"Error writing LLM cache: {e}")
+        except Exception:
+            #invalid output, let the call site handle it without caching it
+            pass
+
+    return response
@@ -1,31 +1,442 @@
+import threading
+import zlib
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field
 from typing import Any
 
-class Resume():
+import msgpack
+import numpy as np
+
+#zstandard is optional, HTML and text fields fall back to zlib without it
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+#written first in every to_bytes payload, bump it whenever the field layout below changes
+SERIAL_VERSION = 2
+
+#text fields shorter than this are stored as plain strings, longer ones are compressed
+_COMPRESS_MIN_BYTES = 512
+_CODEC_ZLIB = 1
+_CODEC_ZSTD = 2
+
+#fields of the dict each KeywordTable row is presented as, in the order extract_keywords_and_phrases used to build them
+_KEYWORD_FIELDS = ('lemma', 'display_form', 'count', 'snippet', 'form_count')
+
+
+def _compress(data: bytes) -> list:
+    if zstandard is not None:
+        return [_CODEC_ZSTD, zstandard.ZstdCompressor(level=3).compress(data)]
+    #level 1: session payloads are mostly markup and repeated words, higher levels cost time for little gain
+    return [_CODEC_ZLIB, zlib.compress(data, 1)]
+
+
+def _decompress(value: list) -> bytes:
+    codec, data = value
+    if codec == _CODEC_ZSTD:
+        if zstandard is None:
+            raise ValueError("payload was compressed with zstd but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == _CODEC_ZLIB:
+        return zlib.decompress(data)
+    raise ValueError(f"unknown codec {codec}")
+
+
+def _pack_text(text: str):
+    data = text.encode('utf-8')
+    if len(data) < _COMPRESS_MIN_BYTES:
+        return text
+    return _compress(data)
+
+
+def _unpack_text(value) -> str:
+    if isinstance(value, str):
+        return value
+    return _decompress(value).decode('utf-8')
+
+
+def _pack_keywords(keywords: "KeywordTable"):
+    #rows of strings and offsets, the interned ids only mean something inside this process
+    rows = keywords.to_rows()
+    data = msgpack.packb(rows, use_bin_type=True)
+    if len(data) < _COMPRESS_MIN_BYTES:
+        return rows
+    return _compress(data)
+
+
+def _unpack_keywords(value, text: str) -> "KeywordTable":
+    if value and isinstance(value[0], int):
+        value = msgpack.unpackb(_decompress(value), raw=False, strict_map_key=False)
+    return KeywordTable.from_rows(value, text)
+
+
+def _pack_array(array):
+    if array is None:
+        return None
+    return [array.dtype.str, list(array.shape), array.tobytes()]
+
+
+def _unpack_array(value):
+    if value is None:
+        return None
+    dtype, shape, data = value
+    #copy so the array owns writable memory instead of viewing the payload bytes
+    return np.frombuffer(data, dtype=np.dtype(dtype)).reshape(shape).copy()
+
+
+def _dumps(kind: str, fields: list) -> bytes:
+    return msgpack.packb([SERIAL_VERSION, kind, fields], use_bin_type=True)
+
+
+def _loads(kind: str, data: bytes) -> list:
+    payload = msgpack.unpackb(data, raw=False, strict_map_key=False)
+    if not isinstance(payload, list) or len(payload) != 3:
+        raise ValueError("not a serialized model")
+    version, payload_kind, fields = payload
+    if version != SERIAL_VERSION:
+        raise ValueError(f"unsupported serialization version {version}, expected {SERIAL_VERSION}")
+    if payload_kind != kind:
+        raise ValueError(f"payload holds a {payload_kind}, not a {kind}")
+    return fields
+
+
+
+
+class _Vocabulary():
+    """
+    Process-wide table of interned keyword strings.
+    Lemmas and display forms come from the phrase matcher's fixed keyword list, so it stays small.
+    """
     def __init__(self):
-        self.plaintext: str = ""
-        
-        self.name: str = ""
-        self.contact_info: dict = {}
+        self._ids = {}
+        self._strings = []
+        self._lock = threading.Lock()
+
+    def intern(self, text: str) -> int:
+        id = self._ids.get(text)
+        if id is None:
+            with self._lock:
+                id = self._ids.get(text)
+                if id is None:
+                    id = len(self._strings)
+                    self._strings.append(text)
+                    self._ids[text] = id
+        return id
+
+    def lookup(self, text: str) -> int:
+        """
+        Id of an already interned string, -1 if it was never seen.
+        """
+        return self._ids.get(text, -1)
+
+    def __getitem__(self, id: int) -> str:
+        return self._strings[id]
+
+
+vocabulary = _Vocabulary()
+
+
+def _ids() -> array:
+    return array('I')
+
+
+@dataclass(slots=True, eq=False)
+class KeywordTable():
+    """
+    Keywords of one document stored column by column instead of as one dict per keyword.
+
+    Lemmas and display forms are ids into the shared vocabulary, snippets are offsets into text (the
+    document's plaintext, shared rather than copied) and the form counts of row i are
+    form_ids[form_offsets[i]:form_offsets[i + 1]] with matching form_counts.
+
+    Indexing and iterating yield the dicts extract_keywords_and_phrases used to return, built on access,
+    so callers reading entry['lemma'] or entry['count'] work unchanged. Editing those dicts does not change the table.
+    """
+    text: str = field(default="", repr=False)
+    lemma_ids: array = field(default_factory=_ids)
+    display_ids: array = field(default_factory=_ids)
+    counts: array = field(default_factory=_ids)
+    snippet_starts: array = field(default_factory=_ids)
+    snippet_ends: array = field(default_factory=_ids)
+    form_offsets: array = field(default_factory=lambda: array('I', [0]))
+    form_ids: array = field(default_factory=_ids)
+    form_counts: array = field(default_factory=_ids)
+
+    def append(self, lemma: str, display_form: str, count: int, snippet_start: int, snippet_end: int, form_count: dict):
+        self.lemma_ids.append(vocabulary.intern(lemma))
+        self.display_ids.append(vocabulary.intern(display_form))
+        self.counts.append(count)
+        self.snippet_starts.append(snippet_start)
+        self.snippet_ends.append(snippet_end)
+        for form, form_total in form_count.items():
+            self.form_ids.append(vocabulary.intern(form))
+            self.form_counts.append(form_total)
+        self.form_offsets.append(len(self.form_ids))
+
+    @classmethod
+    def from_entries(cls, entries: list, text: str) -> "KeywordTable":
+        """
+        Build a table from keyword dicts whose snippets are substrings of text.
+        """
+        table = cls(text)
+        for entry in entries:
+            start = text.find(entry['snippet'])
+            if start < 0:
+                raise ValueError(f"snippet of {entry['lemma']!r} is not in the text")
+            table.append(entry['lemma'], entry['display_form'], entry['count'],
+                         start, start + len(entry['snippet']), entry['form_count'])
+        return table
 
-        self.keywords: list[str] = []
-        self.sections: list[dict[str, Any]] = []
+    def to_rows(self) -> list:
+        return [[self.lemma(i), vocabulary[self.display_ids[i]], self.counts[i],
+                 self.snippet_starts[i], self.snippet_ends[i], self.form_count(i)] for i in range(len(self))]
+
+    @classmethod
+    def from_rows(cls, rows: list, text: str) -> "KeywordTable":
+        table = cls(text)
+        for row in rows:
+            table.append(*row)
+        return table
+
+    def __reduce__(self):
+        #pickle as strings, ids are not valid in another process
+        return (KeywordTable.from_rows, (self.to_rows(), self.text))
+
+    def __deepcopy__(self, memo):
+        #ids stay valid inside the process, so a copy only needs new columns
+        return KeywordTable(self.text, *(array('I', column) for column in (
+            self.lemma_ids, self.display_ids, self.counts, self.snippet_starts, self.snippet_ends,
+            self.form_offsets, self.form_ids, self.form_counts)))
+
+    def __len__(self) -> int:
+        return len(self.lemma_ids)
+
+    def lemma(self, i: int) -> str:
+        return vocabulary[self.lemma_ids[i]]
+
+    def lemmas(self) -> list[str]:
+        return [vocabulary[id] for id in self.lemma_ids]
+
+    def snippet(self, i: int) -> str:
+        return self.text[self.snippet_starts[i]:self.snippet_ends[i]]
+
+    def form_count(self, i: int) -> dict:
+        start, end = self.form_offsets[i], self.form_offsets[i + 1]
+        return {vocabulary[self.form_ids[j]]: self.form_counts[j] for j in range(start, end)}
+
+    def entry(self, i: int) -> dict:
+        return {
+            'lemma': self.lemma(i),
+            'display_form': vocabulary[self.display_ids[i]],
+            'count': self.counts[i],
+            'snippet': self.snippet(i),
+            'form_count': self.form_count(i),
+        }
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.entry(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("keyword index out of range")
+        return self.entry(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.entry(i)
+
+    def to_list(self) -> list[dict]:
+        return [self.entry(i) for i in range(len(self))]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (KeywordTable, list)):
+            return self.to_list() == list(other)
+        return NotImplemented
+
+    def index(self) -> "KeywordIndex":
+        return KeywordIndex(self)
+
+    def nbytes(self) -> int:
+        """
+        Bytes held by the columns. The text is not counted, it is the owner's plaintext.
+        """
+        columns = (self.lemma_ids, self.display_ids, self.counts, self.snippet_starts, self.snippet_ends,
+                   self.form_offsets, self.form_ids, self.form_counts)
+        return sum(column.buffer_info()[1] * column.itemsize for column in columns)
+
+
+class KeywordIndex():
+    """
+    Lemma -> keyword entry lookup over a KeywordTable, a sorted array of lemma ids searched with bisect.
+    Supports the dict operations score_resume uses (get, [], in, len).
+    """
+    __slots__ = ('table', '_ids', '_rows')
+
+    def __init__(self, table: KeywordTable):
+        self.table = table
+        order = sorted(range(len(table)), key=table.lemma_ids.__getitem__)
+        self._ids = array('I', (table.lemma_ids[i] for i in order))
+        self._rows = array('I', order)
+
+    def __reduce__(self):
+        #rebuilt from the table, whose pickle does not carry process-local ids
+        return (KeywordIndex, (self.table,))
+
+    def find(self, lemma: str) -> int:
+        """
+        Row of lemma in the table, -1 if it is not there.
+        """
+        id = vocabulary.lookup(lemma)
+        if id < 0:
+            return -1
+        position = bisect_left(self._ids, id)
+        if position < len(self._ids) and self._ids[position] == id:
+            return self._rows[position]
+        return -1
+
+    def get(self, lemma: str, default=None):
+        row = self.find(lemma)
+        return self.table.entry(row) if row >= 0 else default
+
+    def __getitem__(self, lemma: str) -> dict:
+        row = self.find(lemma)
+        if row < 0:
+            raise KeyError(lemma)
+        return self.table.entry(row)
+
+    def __contains__(self, lemma: str) -> bool:
+        return self.find(lemma) >= 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def nbytes(self) -> int:
+        return self._ids.buffer_info()[1] * self._ids.itemsize + self._rows.buffer_info()[1] * self._rows.itemsize
+
+
+#models keep the default object repr, a generated one would print the whole resume text and html wherever a session is logged
+@dataclass(slots=True, repr=False)
+class Resume():
+    plaintext: str = ""
+
+    name: str = ""
+    contact_info: dict = field(default_factory=dict)
+
+    keywords: KeywordTable = field(default_factory=KeywordTable)
+    #lemma -> keyword entry, built once from keywords for fast matching in score_resume
+    keyword_index: KeywordIndex | None = field(default=None, compare=False, repr=False)
+    sections: list[dict[str, Any]] = field(default_factory=list)
+
+    def to_fields(self) -> list:
+        return [_pack_text(self.plaintext), self.name, self.contact_info, _pack_keywords(self.keywords), self.sections]
+
+    @classmethod
+    def from_fields(cls, fields: list) -> "Resume":
+        resume = cls()
+        plaintext, resume.name, resume.contact_info, keywords, resume.sections = fields
+        resume.plaintext = _unpack_text(plaintext)
+        resume.keywords = _unpack_keywords(keywords, resume.plaintext)
+        #the index only points at the keyword rows, so it is rebuilt instead of stored
+        resume.keyword_index = resume.keywords.index()
+        return resume
+
+    def to_bytes(self) -> bytes:
+        return _dumps("Resume", self.to_fields())
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Resume":
+        return cls.from_fields(_loads("Resume", data))
       
        
+@dataclass(slots=True, repr=False)
 class Job():
-  def __init__(self):
-    self.plaintext: str = ""
-    self.keywords: list(dict) = []
-    self.html: str = ""
+  plaintext: str = ""
+  keywords: KeywordTable = field(default_factory=KeywordTable)
+  html: str = ""
+
+  def to_fields(self) -> list:
+    return [_pack_text(self.plaintext), _pack_keywords(self.keywords), _pack_text(self.html)]
+
+  @classmethod
+  def from_fields(cls, fields: list) -> "Job":
+    job = cls()
+    plaintext, keywords, html = fields
+    job.plaintext = _unpack_text(plaintext)
+    job.keywords = _unpack_keywords(keywords, job.plaintext)
+    job.html = _unpack_text(html)
+    return job
+
+  def to_bytes(self) -> bytes:
+    return _dumps("Job", self.to_fields())
 
+  @classmethod
+  def from_bytes(cls, data: bytes) -> "Job":
+    return cls.from_fields(_loads("Job", data))
+
+@dataclass(slots=True, eq=False, repr=False)
 class User():
-  def __init__(self):
-    self.resume = Resume()
-    self.job = Job()
-    self.resume_html = ""
-    self.resume_html_new = ""
-    self.matched_keywords = {}
-    self.unmatched_keywords = []
-    self.current_keyword = ""
+  resume: Resume = field(default_factory=Resume)
+  job: Job = field(default_factory=Job)
+  resume_html: str = ""
+  resume_html_new: str = ""
+  matched_keywords: dict = field(default_factory=dict)
+  unmatched_keywords: list = field(default_factory=list)
+  current_keyword: str = ""
+
+  #bullets of resume_html, embedded once at upload by reword.index_bullets
+  #bullet i is bullet_text[bullet_offsets[i]:bullet_offsets[i + 1]] and row i of bullet_embeddings
+  bullet_text: str = ""
+  bullet_offsets: np.ndarray | None = None
+  bullet_embeddings: np.ndarray | None = None
+  #the bullet changed by the pending reword, re-embedded alone if the user keeps it
+  reworded_bullet_index: int = -1
+  reworded_bullet: str = ""
+
+  def to_bytes(self) -> bytes:
+    """
+    Versioned msgpack encoding of the session for the session backends.
+    Large text and HTML fields are compressed with zstd when available, zlib otherwise.
+    """
+    return _dumps("User", [
+      self.resume.to_fields(),
+      self.job.to_fields(),
+      _pack_text(self.resume_html),
+      _pack_text(self.resume_html_new),
+      self.matched_keywords,
+      self.unmatched_keywords,
+      self.current_keyword,
+      _pack_text(self.bullet_text),
+      _pack_array(self.bullet_offsets),
+      _pack_array(self.bullet_embeddings),
+      self.reworded_bullet_index,
+      self.reworded_bullet,
+    ])
+
+  @classmethod
+  def from_bytes(cls, data: bytes) -> "User":
+    """
+    Decode a to_bytes payload. Raises ValueError for payloads from another version or model.
+    """
+    (resume, job, resume_html, resume_html_new, matched_keywords, unmatched_keywords, current_keyword,
+     bullet_text, bullet_offsets, bullet_embeddings, reworded_bullet_index, reworded_bullet) = _loads("User", data)
+
+    user = cls()
+    user.resume = Resume.from_fields(resume)
+    user.job = Job.from_fields(job)
+    user.resume_html = _unpack_text(resume_html)
+    user.resume_html_new = _unpack_text(resume_html_new)
+    user.matched_keywords = matched_keywords
+    user.unmatched_keywords = unmatched_keywords
+    user.current_keyword = current_keyword
+    user.bullet_text = _unpack_text(bullet_text)
+    user.bullet_offsets = _unpack_array(bullet_offsets)
+    user.bullet_embeddings = _unpack_array(bullet_embeddings)
+    user.reworded_bullet_index = reworded_bullet_index
+    user.reworded_bullet = reworded_bullet
+    return user
 
     #self.keywords = [{
     #        'lemma': lemma,
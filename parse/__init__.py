@@ -1,5 +1,5 @@
 # Parse package for resume parsing functionality
 from .parse_sections import parse_education, parse_experience, parse_projects
-from .parse_plaintext import get_text_from_pdf, clean_text, extract_keywords_and_phrases
+from .parse_plaintext import get_text_from_pdf, clean_text, extract_keywords_and_phrases, extract_keywords_batch
 
-__all__ = ['parse_education', 'parse_experience', 'parse_projects', 'get_text_from_pdf', 'clean_text', 'extract_keywords_and_phrases']
+__all__ = ['parse_education', 'parse_experience', 'parse_projects', 'get_text_from_pdf', 'clean_text', 'extract_keywords_and_phrases', 'extract_keywords_batch']
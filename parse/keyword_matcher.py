@@ -0,0 +1,222 @@
+import hashlib
+import os
+import struct
+import sys
+import threading
+import zlib
+from typing import TYPE_CHECKING
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import keywords
+
+#spaCy is imported where it is used so importing this module stays cheap
+if TYPE_CHECKING:
+    from spacy.matcher import PhraseMatcher
+
+
+#one compiled matcher is shared by every request in the process
+#it is rebuilt only when the nlp vocab or the keyword list it was compiled from changes
+#stored as a single (key, matcher) tuple so readers never see a key paired with the wrong matcher
+_compiled = None
+_matcher_lock = threading.Lock()
+
+#precompiled patterns written by `python -m parse.keyword_matcher`
+ARTIFACT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'eng_keywords.bin')
+
+#file layout: magic, format version, sha256 fingerprint, pattern count, then a zlib compressed utf-8 payload
+#each payload record is "token\x1ftoken...\x1elemma" and records are separated by newlines
+#the lemmas are not used by the matcher, they are read by `python -m embed.store` to precompute keyword embeddings
+_ARTIFACT_MAGIC = b'ATSKW'
+_ARTIFACT_VERSION = 1
+_ARTIFACT_HEADER = struct.Struct('<5sB32sI')
+_TOKEN_SEP = '\x1f'
+_LEMMA_SEP = '\x1e'
+
+
+def _keywords_fingerprint() -> int:
+    """
+    Cheap fingerprint of the keyword list so edits to keywords.eng_keywords at runtime invalidate the matcher.
+    """
+    return hash(tuple(keywords.eng_keywords))
+
+
+def _artifact_fingerprint(nlp) -> bytes:
+    """
+    Fingerprint of everything the artifact depends on: the keyword list and the tokenizer that split it.
+    """
+    import spacy
+
+    digest = hashlib.sha256()
+    digest.update(spacy.__version__.encode('utf-8'))
+    digest.update(f"{nlp.meta.get('name')}-{nlp.meta.get('version')}".encode('utf-8'))
+    digest.update('\n'.join(keywords.eng_keywords).encode('utf-8'))
+    return digest.digest()
+
+
+def _tokenize_keywords(nlp) -> tuple[list, list]:
+    """
+    Split keywords.eng_keywords into lowercased token sequences, dropping the duplicate entries in keywords.py.
+    Returns the token sequences and the phrase each one came from.
+    """
+    patterns = []
+    phrases = []
+    seen = set()
+    for phrase in keywords.eng_keywords:
+        tokens = tuple(token.lower_ for token in nlp.make_doc(phrase))
+        if not tokens or tokens in seen:
+            continue
+        seen.add(tokens)
+        patterns.append(list(tokens))
+        phrases.append(phrase)
+
+    return patterns, phrases
+
+
+def compile_patterns(nlp) -> tuple[list, list]:
+    """
+    Compile keywords.eng_keywords into deduplicated token sequences plus the lemma of each keyword.
+    """
+    patterns, phrases = _tokenize_keywords(nlp)
+
+    #lemmas need the tagger, so run the full pipeline over the unique phrases once
+    lemmas = [doc[:].lemma_.lower() for doc in nlp.pipe(phrases)]
+
+    return patterns, lemmas
+
+
+def write_artifact(nlp, path: str = ARTIFACT_PATH) -> int:
+    """
+    Compile the keyword patterns and write them to path. Returns the number of patterns written.
+    """
+    patterns, lemmas = compile_patterns(nlp)
+
+    records = [_TOKEN_SEP.join(tokens) + _LEMMA_SEP + lemma for tokens, lemma in zip(patterns, lemmas)]
+    payload = zlib.compress('\n'.join(records).encode('utf-8'), 9)
+    header = _ARTIFACT_HEADER.pack(_ARTIFACT_MAGIC, _ARTIFACT_VERSION, _artifact_fingerprint(nlp), len(records))
+
+    #write to a temp file first so a worker starting mid-build never reads a half written artifact
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+    return len(records)
+
+
+def load_artifact(nlp, path: str = ARTIFACT_PATH):
+    """
+    Load precompiled patterns and lemmas from path.
+    Returns None if the artifact is missing, unreadable, or was built from a different keyword list or model.
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    if len(data) < _ARTIFACT_HEADER.size:
+        return None
+
+    magic, version, fingerprint, count = _ARTIFACT_HEADER.unpack_from(data)
+    if magic != _ARTIFACT_MAGIC or version != _ARTIFACT_VERSION:
+        return None
+    if fingerprint != _artifact_fingerprint(nlp):
+        print(f'Keyword matcher artifact {path} is stale, compiling from keywords.py')
+        return None
+
+    try:
+        payload = zlib.decompress(data[_ARTIFACT_HEADER.size:]).decode('utf-8')
+    except (zlib.error, UnicodeDecodeError):
+        return None
+
+    patterns = []
+    lemmas = []
+    for record in payload.split('\n'):
+        tokens, separator, lemma = record.partition(_LEMMA_SEP)
+        if not separator:
+            return None
+        patterns.append(tokens.split(_TOKEN_SEP))
+        lemmas.append(lemma)
+
+    if len(patterns) != count:
+        return None
+
+    return patterns, lemmas
+
+
+def get_keyword_patterns(nlp) -> tuple[list, list]:
+    """
+    Return (token sequences, lemmas) for keywords.eng_keywords, from the artifact when it is fresh.
+    The matcher only needs the token sequences, the lemmas are stored for embed.store, which embeds them at build time.
+    """
+    loaded = load_artifact(nlp)
+    if loaded is not None:
+        return loaded
+    return compile_patterns(nlp)
+
+
+def build_phrase_matcher(nlp) -> "PhraseMatcher":
+    """
+    Build a PhraseMatcher for keywords.eng_keywords.
+    Patterns come from the precompiled artifact when it is fresh, otherwise they are compiled from keywords.py.
+    """
+    from spacy.matcher import PhraseMatcher
+    from spacy.tokens import Doc
+
+    loaded = load_artifact(nlp)
+    if loaded is not None:
+        patterns = loaded[0]
+    else:
+        patterns = _tokenize_keywords(nlp)[0]
+
+    #attr="LOWER" makes the matcher case insensitive
+    phrase_matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+
+    #building docs straight from the stored words skips the tokenizer entirely
+    phrase_patterns = [Doc(nlp.vocab, words=tokens) for tokens in patterns if tokens]
+
+    phrase_matcher.add("eng_keywords", phrase_patterns)
+
+    return phrase_matcher
+
+
+def get_phrase_matcher(nlp) -> "PhraseMatcher":
+    """
+    Return the shared PhraseMatcher for nlp, compiling it on first use.
+    Safe to call from multiple threads; only one thread compiles.
+    """
+    global _compiled
+
+    key = (id(nlp.vocab), _keywords_fingerprint())
+
+    #fast path: already compiled for this vocab and keyword list
+    compiled = _compiled
+    if compiled is not None and compiled[0] == key:
+        return compiled[1]
+
+    with _matcher_lock:
+        #another thread may have finished compiling while we waited on the lock
+        if _compiled is None or _compiled[0] != key:
+            _compiled = (key, build_phrase_matcher(nlp))
+
+        return _compiled[1]
+
+
+def reset_phrase_matcher():
+    """
+    Drop the shared matcher so the next call recompiles it.
+    """
+    global _compiled
+
+    with _matcher_lock:
+        _compiled = None
+
+
+if __name__ == '__main__':
+    #build step: python -m parse.keyword_matcher [output path]
+    from parse.parse_plaintext import get_nlp
+
+    output_path = sys.argv[1] if len(sys.argv) > 1 else ARTIFACT_PATH
+    count = write_artifact(get_nlp(), output_path)
+    print(f'Wrote {count} keyword patterns to {output_path}')
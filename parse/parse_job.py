@@ -5,10 +5,7 @@ def parse_job(job: Job) -> Job:
 
     text = job.plaintext
 
-    keyword_list = []
-
-    for keyword in job.keywords:
-        keyword_list.append(keyword['lemma'])
+    keyword_list = job.keywords.lemmas()
 
     #sort keywords by word length
     sorted_keywords = sorted(keyword_list, key=lambda x: len(x.split()), reverse = True)
@@ -1,40 +1,155 @@
+import asyncio
 import re
-import spacy
 import os
-import PyPDF2
 import sys
+import threading
+import time
 
+from concurrent.futures.process import BrokenProcessPool
 from io import BytesIO
 from dotenv import load_dotenv
 
-from spacy.matcher import PhraseMatcher
-
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from keywords import common_words, keywords, eng_keywords, resume_headers, job_titles_keywords, education_headers, experience_headers, skills_headers, projects_headers, misc_headers
-from models import Resume
+from keywords import common_words, keywords, resume_headers, job_titles_keywords, education_headers, experience_headers, skills_headers, projects_headers, misc_headers
+from models import Resume, KeywordTable
+from config import EXTRACTION_PROFILE, SECTION_PARSE_MODE, SECTION_PARSE_CONCURRENCY, SECTION_PARSE_GLOBAL_CONCURRENCY, PDF_PARALLEL_MIN_PAGES, PDF_PARALLEL_WORKERS
+from config import PDF_MAX_PAGES, PDF_EXTRACT_TIMEOUT
+from workers.workers import get_process_executor, shutdown_process_pool
+
+from .keyword_matcher import get_phrase_matcher
+from .parse_sections import parse_education, parse_experience, parse_projects, parse_skills, parse_sections_combined#, parse_misc?
+
+
+
+
+#components excluded from en_core_web_sm for each extraction profile
+#keyword extraction only reads phrase matches and lemmas, and the rule based lemmatizer only needs
+#tok2vec -> tagger -> attribute_ruler for POS, so the dependency parser and ner are dead weight
+NLP_PROFILES = {
+    "full": [],
+    "keywords": ["parser", "ner"],
+}
 
-from .parse_sections import parse_education, parse_experience, parse_projects, parse_skills#, parse_misc?
+def load_nlp(profile: str = EXTRACTION_PROFILE):
+    if profile not in NLP_PROFILES:
+        raise ValueError(f"Unknown extraction profile {profile!r}, expected one of {list(NLP_PROFILES)}")
 
+    import spacy
 
+    #exclude (rather than disable) so the unused components are never loaded into memory
+    return spacy.load("en_core_web_sm", exclude=NLP_PROFILES[profile])
 
+#loaded on first use instead of at import, so a process that only serves pages never loads spaCy
+_nlp = None
+_nlp_lock = threading.Lock()
 
-nlp = spacy.load("en_core_web_sm")
+def get_nlp():
+    global _nlp
+    if _nlp is None:
+        #parse pool threads can ask for the pipeline at the same time, only one of them loads it
+        with _nlp_lock:
+            if _nlp is None:
+                _nlp = load_nlp()
+    return _nlp
 
-def get_text_from_pdf(file_bytes) -> str:
+def __getattr__(name: str):
+    #keeps `parse_plaintext.nlp` working for callers written before the pipeline was lazy
+    if name == "nlp":
+        return get_nlp()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
+#caps OpenAI section parsing calls across every request in this process
+_section_parse_slots = asyncio.Semaphore(SECTION_PARSE_GLOBAL_CONCURRENCY)
+
+class DocumentRejected(Exception):
+    """
+    Raised for PDFs that are not extracted: unreadable, over PDF_MAX_PAGES or over the PDF_EXTRACT_TIMEOUT budget.
+    The message is written for the user.
+    """
+
+def get_text_from_pdf(pdf, min_parallel_pages: int = PDF_PARALLEL_MIN_PAGES, max_pages: int = PDF_MAX_PAGES,
+                      timeout: float = PDF_EXTRACT_TIMEOUT) -> str:
+    """
+    Extract the text of every page, in order, from PDF bytes or a binary file such as the spooled upload.
+    Documents with at least min_parallel_pages pages are split into page ranges extracted on the process pool,
+    smaller ones (and any document if the pool cannot be used) are extracted serially.
+    Raises DocumentRejected for unreadable files, more than max_pages pages or extraction past timeout seconds.
+    """
     #put binary file data into a format PyPDF2 can work with
-    pdf_file = BytesIO(file_bytes)
+    pdf_file = BytesIO(pdf) if isinstance(pdf, (bytes, bytearray)) else pdf
 
-    #PDF reader object is able to extract text from the PDF
-    pdf_reader = PyPDF2.PdfReader(pdf_file)
+    import PyPDF2
+
+    #wall clock, so the process pool workers can check the same deadline
+    deadline = time.time() + timeout if timeout else None
 
-    text = str()
+    #PDF reader object is able to extract text from the PDF
+    try:
+        pdf_reader = PyPDF2.PdfReader(pdf_file)
+        page_count = len(pdf_reader.pages)
+    except PyPDF2.errors.PyPdfError as e:
+        raise DocumentRejected("This file could not be read as a PDF. Please upload a PDF exported from your resume.") from e
+
+    if max_pages and page_count > max_pages:
+        raise DocumentRejected(f"This PDF has {page_count} pages, resumes of up to {max_pages} pages are supported.")
+
+    if min_parallel_pages and page_count >= min_parallel_pages and PDF_PARALLEL_WORKERS > 1:
+        if isinstance(pdf, (bytes, bytearray)):
+            file_bytes = pdf
+        else:
+            pdf_file.seek(0)
+            file_bytes = pdf_file.read()
+        try:
+            return extract_pages_parallel(file_bytes, page_count, deadline)
+        except (BrokenProcessPool, OSError, RuntimeError) as e:
+            #a crashed or unstartable pool should not fail the upload, start a fresh pool on the next call
+            print(f"Parallel PDF extraction failed, extracting serially: {e}")
+            shutdown_process_pool(wait=False)
+
+    return extract_pages(pdf_reader, 0, page_count, deadline)
+
+def extract_pages(pdf_reader, start: int, end: int, deadline: float | None = None) -> str:
+    """
+    Text of pages start to end - 1, giving up once deadline (a time.time() value) has passed.
+    Raises DocumentRejected for a page that cannot be extracted.
+    """
+    texts = []
+    for i in range(start, end):
+        #checked between pages, a single pathological page still runs to completion
+        if deadline is not None and time.time() > deadline:
+            raise DocumentRejected("This PDF is taking too long to read. Please upload a smaller or simpler PDF.")
+        #malformed page content raises all sorts of errors (KeyError, ValueError, ...), not only PyPdfError
+        try:
+            texts.append(pdf_reader.pages[i].extract_text())
+        except Exception as e:
+            raise DocumentRejected("This file could not be read as a PDF. Please upload a PDF exported from your resume.") from e
+    return "".join(texts)
+
+def extract_page_range(file_bytes, start: int, end: int, deadline: float | None = None) -> str:
+    """
+    Text of pages start to end - 1, run in a process pool worker.
+    """
+    import PyPDF2
 
-    for page in pdf_reader.pages:
-        text += page.extract_text()
+    return extract_pages(PyPDF2.PdfReader(BytesIO(file_bytes)), start, end, deadline)
 
-    
-    return text
+def extract_pages_parallel(file_bytes, page_count: int, deadline: float | None = None) -> str:
+    """
+    Split the pages into one contiguous range per pool worker and join the extracted ranges in page order.
+    """
+    range_count = min(PDF_PARALLEL_WORKERS, page_count)
+    bounds = [page_count * i // range_count for i in range(range_count + 1)]
+
+    executor = get_process_executor()
+    futures = [executor.submit(extract_page_range, file_bytes, start, end, deadline) for start, end in zip(bounds, bounds[1:])]
+    try:
+        #the workers stop themselves at the deadline, the extra second covers a page that was already running
+        return "".join(future.result(timeout=None if deadline is None else max(0, deadline - time.time()) + 1)
+                       for future in futures)
+    except TimeoutError as e:
+        for future in futures:
+            future.cancel()
+        raise DocumentRejected("This PDF is taking too long to read. Please upload a smaller or simpler PDF.") from e
 
 def clean_text(text: str) -> str:
     
@@ -49,26 +164,42 @@ def clean_text(text: str) -> str:
 
     return text
 
-def extract_keywords_and_phrases(text: str, allowed_pos = ["NOUN", "PROPN", "ADJ", "VERB"], snippet_length = 40) -> dict:
+def extract_keywords_and_phrases(text: str, allowed_pos = ["NOUN", "PROPN", "ADJ", "VERB"], snippet_length = 40) -> KeywordTable:
     
+    nlp = get_nlp()
+
     #use spacy to process the text
     doc = nlp(text)
-    #dictionary to hold important words while preserving order
-    important_words = dict()
 
-#----Initialize PhraseMatcher and define phrases to match----# 
+#----Get the shared PhraseMatcher----# 
     #a phrase matcher object allows spacy to group together multi-word phrases
-    #nlp.vocab is essentially a dictionary of all words spacy knows about
-    #attr="LOWER" makes the matcher case insensitive
-    phrase_matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+    #it is compiled from keywords.eng_keywords once per process and reused by every call
+    phrase_matcher = get_phrase_matcher(nlp)
+
+    return keywords_from_doc(doc, text, phrase_matcher, snippet_length)
+
+def extract_keywords_batch(texts, n_process: int = 1, batch_size: int = 16, snippet_length = 40) -> list:
+    """
+    Extract keywords from many documents at once.
+    Streams the texts through nlp.pipe (n_process=-1 uses every core) and reuses one matcher,
+    returning one KeywordTable per text, the same as extract_keywords_and_phrases.
+    """
+    texts = list(texts)
+    nlp = get_nlp()
+    phrase_matcher = get_phrase_matcher(nlp)
+
+    #the pipeline components run in the worker processes, the cheap match pass runs here on the returned docs
+    docs = nlp.pipe(texts, n_process=n_process, batch_size=batch_size)
 
-    # Convert phrases into spaCy docs so phrase matcher is able to read them properly
-    phrase_patterns = []
-    for phrase in eng_keywords:
-        phrase_patterns.append(nlp.make_doc(phrase))
+    return [keywords_from_doc(doc, text, phrase_matcher, snippet_length) for text, doc in zip(texts, docs)]
 
-    #Adds the phrase patterns to the matcher in order to identify them in the text, now phrase matcher knows which phrases to look for
-    phrase_matcher.add("eng_keywords", phrase_patterns)
+def keywords_from_doc(doc, text: str, phrase_matcher, snippet_length = 40) -> KeywordTable:
+    """
+    Run the phrase matcher over a processed doc and group matches by lemma.
+    Snippets are kept as offsets into text rather than copied out of it.
+    """
+    #dictionary to hold important words while preserving order
+    important_words = dict()
 
 #----Use PhraseMatcher to find phrases in the text----#
     matches = phrase_matcher(doc)
@@ -79,8 +210,8 @@ def extract_keywords_and_phrases(text: str, allowed_pos = ["NOUN", "PROPN", "ADJ
         display_form = match_span.text.lower()
         if lemma not in important_words:
             idx = match_span.start_char
-            snippet = text[max(0, idx-snippet_length):idx+snippet_length].strip()
-            important_words[lemma] = {'count': 1, 'snippet': snippet,'form_count': {display_form: 1}, 'display_form': display_form}
+            snippet_start, snippet_end = strip_span(text, max(0, idx-snippet_length), min(len(text), idx+snippet_length))
+            important_words[lemma] = {'count': 1, 'snippet': (snippet_start, snippet_end),'form_count': {display_form: 1}, 'display_form': display_form}
         else:
             important_words[lemma]['count'] += 1
             #put the display form of the word into a dictionary to keep track of how many times each form appears
@@ -92,18 +223,23 @@ def extract_keywords_and_phrases(text: str, allowed_pos = ["NOUN", "PROPN", "ADJ
             most_common_form = max(form_items, key=lambda x: x[1])[0]
             important_words[lemma]['display_form'] = most_common_form
 
-    # Convert dictionary to list of dictionaries
-    keywords_list = []
+    #store the grouped words column by column in a KeywordTable
+    keywords_table = KeywordTable(text)
     for lemma, data in important_words.items():
-        keywords_list.append({
-            'lemma': lemma,
-            'display_form': data['display_form'],
-            'count': data['count'],
-            'snippet': data['snippet'],
-            'form_count': data['form_count']
-        })
+        snippet_start, snippet_end = data['snippet']
+        keywords_table.append(lemma, data['display_form'], data['count'], snippet_start, snippet_end, data['form_count'])
     
-    return keywords_list
+    return keywords_table
+
+def strip_span(text: str, start: int, end: int) -> tuple[int, int]:
+    """
+    Offsets of text[start:end].strip() within text.
+    """
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
 
 def extract_name(text: str) -> str:
     """
@@ -391,41 +527,54 @@ async def extract_section_headers(resume: Resume):
 
     return sections
 
-async def extract_sections(sections: dict, resume: Resume):
+async def _run_section_parser(parser, content: str, request_slots: asyncio.Semaphore) -> list | None:
+    #hold a per-request slot and a process-wide slot for the whole OpenAI round-trip
+    async with request_slots, _section_parse_slots:
+        return await parser(content)
+
+async def extract_sections(sections: dict, resume: Resume) -> bool:
+    """
+    Fill resume.sections from the section headers and their text.
+    Returns False if any education/experience/projects section could not be parsed and was left without entries.
+    """
+    #sections that need an OpenAI call are built with empty entries and filled in once every call returns,
+    #so the calls run concurrently while resume.sections keeps the original header order
+    pending = []
+
     for header in sections:
         if header.lower() in education_headers:
             #parses education entries for degree, school, location, duration, and section content
-            education_entries = await parse_education(sections[header])       
             # Create a proper section structure for education
             education_section = {
                 "type": "education",
                 "header": header,
-                "entries": education_entries,  # This is a list of education entries
+                "entries": [],  # This is a list of education entries
             }
-         #   print(education_section[header])
+            pending.append((education_section, parse_education, sections[header]))
 
             resume.sections.append(education_section)
 
         elif header.lower() in experience_headers:
             #parses experience entries for title, company, location, duration, and section content
-            experience_entries = await parse_experience(sections[header])
             experience_section = {
                 "type": "experience",
                 "header": header,
-                "entries": experience_entries #IF SATARTS WITH BULLET POINTS, THEN IT IS THE CONTENT
+                "entries": [] #IF SATARTS WITH BULLET POINTS, THEN IT IS THE CONTENT
             }
+            pending.append((experience_section, parse_experience, sections[header]))
 
             resume.sections.append(experience_section)
 
         elif header.lower() in projects_headers:
             #parses project entries for project, location, affiliation, duration, and section content
             print(f'=== parse_projects INPUT: {sections[header]} ===')
-            projects_entries = await parse_projects(sections[header])
             projects_section = {
                 "type": "projects",
                 "header": header,
-                "entries": projects_entries
+                "entries": []
             }
+            pending.append((projects_section, parse_projects, sections[header]))
+
             resume.sections.append(projects_section)
 
         elif header.lower() in skills_headers:
@@ -457,6 +606,35 @@ async def extract_sections(sections: dict, resume: Resume):
             }
             resume.sections.append(catch_all_section)
 
+    if not pending:
+        return True
+
+    #combined mode sends every section in one request, falling back to per-section calls if it fails
+    if SECTION_PARSE_MODE == "combined":
+        async with _section_parse_slots:
+            combined = await parse_sections_combined([(section["type"], section["header"], content) for section, _, content in pending])
+        if combined is not None:
+            for (section, _, _), entries in zip(pending, combined):
+                section["entries"] = entries
+            return True
+
+    #return_exceptions keeps one failed section from cancelling the others, it just keeps its empty entries
+    #parsers also return None for a failed OpenAI call, both count as a failure so the resume is not cached
+    request_slots = asyncio.Semaphore(SECTION_PARSE_CONCURRENCY)
+    results = await asyncio.gather(
+        *(_run_section_parser(parser, content, request_slots) for _, parser, content in pending),
+        return_exceptions=True,
+    )
+    complete = True
+    for (section, _, _), result in zip(pending, results):
+        if isinstance(result, BaseException) or result is None:
+            print(f"Error parsing {section['type']} section {section['header']!r}: {result or 'the OpenAI call failed'}")
+            complete = False
+            continue
+        section["entries"] = result
+
+    return complete
+
 
 def clean_content(content: str) -> str:
     """
@@ -1,18 +1,14 @@
 
 import json
-from dotenv import load_dotenv
-import os
-from openai import AsyncOpenAI
 
-load_dotenv()
-key = os.getenv('OPEN_AI_KEY')
-client = AsyncOpenAI(api_key=key)
+from llm.client import chat_completion
 
 
-async def parse_education(context: str) -> list:
+async def parse_education(context: str) -> list | None:
     
     """
     Parse education entries from resume text and return structured data.
+    Returns None when the OpenAI call or its JSON fails, so callers can tell a failure from an empty section.
     
     Expected input format examples:
     - "University of Michigan  Ann Arbor, MI\nB.S.E. Chemical Engineering & B.S. Chemistry Aug 2021 – May 2025\nGPA: 3.90 / 4.00 | Capstone: Production of Light Olefins from Methanol"
@@ -121,14 +117,14 @@ async def parse_education(context: str) -> list:
     The "&" symbol and shared dates indicate simultaneous degrees that must be combined.'''
 
     try:
-        completion = await client.chat.completions.create(
+        response = await chat_completion(
+            cache=True,
+            validate=json.loads,
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": prompt}
             ]
         )
-        
-        response = completion.choices[0].message.content
 
         # Parse JSON response and return as Python dictionary
         education_entries = json.loads(response)
@@ -140,15 +136,16 @@ async def parse_education(context: str) -> list:
 
     except json.JSONDecodeError as e:
         print(f"JSON decode error: {e}")
-        return []
+        return None
     except Exception as e:
         print(f"Error parsing education: {e}")
-        return []
+        return None
 
 
-async def parse_experience(context: str) -> list:
+async def parse_experience(context: str) -> list | None:
     """
     Parse work experience entries from resume text and return structured data.
+    Returns None when the OpenAI call or its JSON fails, so callers can tell a failure from an empty section.
     
     Expected input format examples:
     - "Process Engineer\nMarathon Petroleum Company\nSt. Paul, MN\nMay 2018 - Present\n• Led process optimization initiatives\n• Managed production operations"
@@ -248,14 +245,14 @@ async def parse_experience(context: str) -> list:
     ]'''
 
     try:
-        completion = await client.chat.completions.create(
+        response = await chat_completion(
+            cache=True,
+            validate=json.loads,
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": prompt}
             ]
         )
-        
-        response = completion.choices[0].message.content
 
         # Parse JSON response and return as Python dictionary
         experience_entries = json.loads(response)
@@ -267,16 +264,17 @@ async def parse_experience(context: str) -> list:
 
     except json.JSONDecodeError as e:
         print(f"JSON decode error: {e}")
-        return []
+        return None
     except Exception as e:
         print(f"Error parsing experience: {e}")
-        return []
+        return None
 
 
-async def parse_projects(context: str) -> list:
+async def parse_projects(context: str) -> list | None:
 
     """
     Parse projects, research, publications, presentations, and other academic/professional work from resume text and return structured data.
+    Returns None when the OpenAI call or its JSON fails, so callers can tell a failure from an empty section.
     
     Expected input format examples:
     - "Stock Dashboard Application\nWheaton, IL\nPersonal Project\nAug 2025 - Oct 2025\n• Built using React and Python\n• Real-time stock data integration"
@@ -385,14 +383,14 @@ async def parse_projects(context: str) -> list:
     ]'''
 
     try:
-        completion = await client.chat.completions.create(
+        response = await chat_completion(
+            cache=True,
+            validate=json.loads,
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": prompt}
             ]
         )
-        
-        response = completion.choices[0].message.content
 
         # Parse JSON response and return as Python dictionary
         project_entries = json.loads(response)
@@ -404,11 +402,96 @@ async def parse_projects(context: str) -> list:
 
     except json.JSONDecodeError as e:
         print(f"JSON decode error: {e}")
-        return []
+        return None
     except Exception as e:
         print(f"Error parsing projects: {e}")
-        return []
+        return None
         
+# Field definitions shared by the combined prompt, one per section type
+_COMBINED_SCHEMAS = {
+    "education": """{"degree": "Full degree name with major", "school": "School/University name without location", "location": "City, State or 'Remote', null if not given", "duration": "Dates exactly as written, null if not given", "content": "Everything else (GPA, honors, coursework, capstone, thesis, minors), items separated by \\n"}""",
+    "experience": """{"title": "Exact job title", "company": "Full company/organization name without location", "location": "City, State or 'Remote', null if not given", "duration": "Dates exactly as written, null if not given", "content": "Responsibilities, achievements, tools and metrics, one bullet per line separated by \\n"}""",
+    "projects": """{"project": "Project/research/publication title", "location": "City, State or 'Remote', null if not given", "affiliation": "University, organization, conference, or 'Personal Project'", "duration": "Dates exactly as written, null if not given", "content": "Description, technologies, outcomes and metrics, one bullet per line separated by \\n"}""",
+}
+
+
+def _load_combined_response(response: str, section_count: int) -> dict:
+    """
+    JSON of a combined parsing response, raising ValueError unless it has an entry list for every section number.
+    Also used as the cache validator, so a response that dropped a section is never replayed.
+    """
+    parsed = json.loads(response)
+    missing = [i for i in range(section_count) if not isinstance(parsed.get(str(i)), list)]
+    if missing:
+        raise ValueError(f"combined response has no entries for sections {missing}")
+    return parsed
+
+
+async def parse_sections_combined(sections: list) -> list | None:
+    """
+    Parse several education/experience/projects sections with a single OpenAI call.
+
+    sections is a list of (section_type, header, content) tuples. Returns a list of entry lists
+    in the same order and with the same entry structure as parse_education/parse_experience/parse_projects,
+    or None if the call or its JSON could not be used so the caller can fall back to per-section parsing.
+    """
+    section_types = sorted({section_type for section_type, _, _ in sections})
+    schemas = "\n".join(f'    {section_type}: {_COMBINED_SCHEMAS[section_type]}' for section_type in section_types)
+    section_text = "\n\n".join(
+        f'    SECTION {i} (type: {section_type}, header: "{header}"):\n{content}'
+        for i, (section_type, header, content) in enumerate(sections)
+    )
+
+    prompt = f'''You are analyzing several sections of a resume to extract structured entries from each one.
+
+    {section_text}
+
+    Every entry must follow the structure for its section type:
+{schemas}
+
+    PARSING RULES:
+    1. Extract ALL entries from every section. Every job, degree, project, publication or presentation is its own entry.
+    2. Only use text that appears in the section, never invent details. Use null for fields that are not given.
+    3. Keep dates exactly as written in the resume.
+    4. education: degrees earned over the SAME or OVERLAPPING dates (e.g. "B.S.E. Chemical Engineering & B.S. Chemistry Aug 2021 – May 2025") are ONE entry with both degree names. Different dates are separate entries.
+    5. experience: multiple positions at the same company are separate entries.
+    6. content: preserve bullet points, each bullet or distinct item on its own line separated by a newline character (\\n).
+
+    Return ONLY a JSON object mapping each section number to its array of entries, for example:
+    {{"0": [{{...}}, {{...}}], "1": [{{...}}]}}
+    Use an empty array for a section with no entries.'''
+
+    try:
+        response = await chat_completion(
+            cache=True,
+            validate=lambda response: _load_combined_response(response, len(sections)),
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": prompt}
+            ],
+            response_format={"type": "json_object"}
+        )
+
+        # Parse JSON response and line the entries back up with the input sections
+        #a section missing from the response fails the whole call, otherwise it would be served as empty
+        parsed = _load_combined_response(response, len(sections))
+
+        results = []
+        for i in range(len(sections)):
+            entries = parsed[str(i)]
+            for entry in entries:
+                entry['content'] = (entry.get('content') or '').replace('\n','<br>')
+            results.append(entries)
+
+        return results
+
+    except json.JSONDecodeError as e:
+        print(f"JSON decode error: {e}")
+        return None
+    except Exception as e:
+        print(f"Error parsing sections in combined mode: {e}")
+        return None
+
 async def parse_skills(context: str) -> str:
     bullets = ['*', '•', '•', '·', '◦', '▪', '▫', '', '', '']
     for word in context:
@@ -1,70 +1,141 @@
-from bs4 import BeautifulSoup
 import json
-import os
-from dotenv import load_dotenv
-from openai import AsyncOpenAI
-from sentence_transformers import SentenceTransformer
+from llm.client import chat_completion
+from embed.embed import encode
+from embed.store import store
+from workers.workers import run_in_pool
+from models import User
 import numpy as np
 
-# Lazy load the model only when needed (avoid slow startup)
-model = None
 
-def get_model():
-    global model
-    if model is None:
-        model = SentenceTransformer('all-MiniLM-L6-v2')
-    return model
+def extract_bullets(resume_html: str) -> list[str]:
+    """
+    Split the formatted resume into its bullet points, stripped and without empty entries.
+    """
+    from bs4 import BeautifulSoup
 
-load_dotenv()
-key = os.getenv('OPEN_AI_KEY')
-client = AsyncOpenAI(api_key=key)
-
-
-async def get_best_bullet(keyword: str, bullets: list) -> str:
-    model = get_model()  # Load model only when this function is called
-    best_score = 0
-    best_bullet = ''
-    for bullet in bullets:
-        
-        if bullet == '':
-            continue
-
-        #turns the bullet and the keyword into embeddings, vectors with 384 dimensions that maps the semantic meaning of the text to a vector
-        bullet_embedding = model.encode(bullet)
-        keyword_embedding = model.encode(keyword)
-    
-        #takes the dot product of the two vectors and divides by the product of the length of the two vectors to normalize
-        similarity = np.dot(bullet_embedding, keyword_embedding) / (
-            np.linalg.norm(bullet_embedding) * np.linalg.norm(keyword_embedding))
-
-        #scales the score to a percantage out of 100
-        score = similarity * 100
-
-        if score > best_score:
-            best_score = score
-            best_bullet = bullet
-    
-    print(f"the best bullet for the keyword: {keyword} \n {best_bullet}")
-    return best_bullet
-
-
-
-async def reword_bullet(keyword: str, user_session: dict) -> dict:
-    soup = BeautifulSoup(user_session['resume_html'], 'html.parser')
+    soup = BeautifulSoup(resume_html, 'html.parser')
     
     content_divs = soup.find_all('div', class_='section-content')
     
     #Unwrap the content in each div, pass them into bullet list
     bullets = []
-    for i, div in enumerate(content_divs):
+    for div in content_divs:
         div_text = div.get_text().strip()
         if '•' in div_text:
             for bullet in div_text.split('•'):
-                bullets.append(bullet)
+                bullets.append(bullet.strip())
         else:
             bullets.append(div_text)
-    
-    best_bullet = await get_best_bullet(keyword, bullets)
+
+    return [bullet for bullet in bullets if bullet]
+
+
+def pack_bullets(bullets: list) -> tuple[str, np.ndarray]:
+    """
+    Store bullets as one string plus an int32 array of len(bullets) + 1 boundaries, bullet i is text[offsets[i]:offsets[i + 1]].
+    """
+    offsets = np.zeros(len(bullets) + 1, dtype=np.int32)
+    np.cumsum([len(bullet) for bullet in bullets], out=offsets[1:])
+    return ''.join(bullets), offsets
+
+
+def unpack_bullets(text: str, offsets: np.ndarray) -> list[str]:
+    return [text[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+
+def index_bullets(resume_html: str) -> tuple[str, np.ndarray, np.ndarray | None]:
+    """
+    Extract and embed every bullet of a formatted resume once, at upload time.
+    Returns the packed bullet text, its offsets and a float32 matrix with one unit length row per bullet.
+    If embedding fails the matrix is None and rank_bullets encodes the bullets when a reword needs them.
+    """
+    bullets = extract_bullets(resume_html)
+    bullet_text, bullet_offsets = pack_bullets(bullets)
+    try:
+        bullet_embeddings = encode(bullets)
+    except Exception as e:
+        print(f"Error in index_bullets, storing bullets without embeddings: {e}")
+        bullet_embeddings = None
+    return bullet_text, bullet_offsets, bullet_embeddings
+
+
+def rank_bullets(keyword: str, bullets: list, top_k: int = 3, bullet_embeddings: np.ndarray = None) -> list[tuple[int, str, float]]:
+    """
+    Rank bullets by semantic similarity to keyword and return the top_k as (index, bullet, score out of 100), best first.
+    All bullets are encoded in one batched call, or taken from bullet_embeddings (one row per bullet) when given,
+    and scored with a single matrix-vector product.
+    """
+    if bullet_embeddings is None:
+        positions = [i for i, bullet in enumerate(bullets) if bullet.strip()]
+        if positions:
+            bullet_embeddings = encode([bullets[i] for i in positions])
+    else:
+        positions = list(range(len(bullets)))
+
+    if not positions or top_k <= 0:
+        return []
+
+    #rows are unit length, so the dot product with the keyword vector is the cosine similarity
+    keyword_embedding = store.get(keyword)
+    scores = bullet_embeddings @ keyword_embedding
+
+    #partial sort, only the top_k scores need ordering
+    top_k = min(top_k, len(positions))
+    top = np.argpartition(-scores, top_k - 1)[:top_k]
+    top = top[np.argsort(-scores[top])]
+
+    #scales the score to a percentage out of 100
+    return [(positions[i], bullets[positions[i]], float(scores[i]) * 100) for i in top]
+
+
+async def get_best_bullet(keyword: str, bullets: list, bullet_embeddings: np.ndarray = None) -> tuple[int, str]:
+    """
+    Return (index, bullet) of the bullet closest to keyword, or (-1, '') when there are no bullets.
+    Raises PoolSaturated when the parse pool is full, ranking may encode every bullet and must stay off the event loop.
+    """
+    ranked = await run_in_pool(rank_bullets, keyword, bullets, 1, bullet_embeddings)
+
+    best_index, best_bullet = (ranked[0][0], ranked[0][1]) if ranked else (-1, '')
+
+    print(f"the best bullet for the keyword: {keyword} \n {best_bullet}")
+    return best_index, best_bullet
+
+
+async def accept_reword(user_session: User) -> User:
+    """
+    Keep the pending reword: the reworded html becomes the resume and only the changed bullet is re-embedded.
+    Raises PoolSaturated, before the session is changed, when the parse pool is full.
+    """
+    index = user_session.reworded_bullet_index
+    if index < 0 or user_session.bullet_embeddings is None:
+        user_session.resume_html = user_session.resume_html_new
+        return user_session
+
+    #encode first so a full pool leaves the reword pending and the user can confirm again
+    embedding = await run_in_pool(encode, [user_session.reworded_bullet])
+
+    user_session.resume_html = user_session.resume_html_new
+    bullets = unpack_bullets(user_session.bullet_text, user_session.bullet_offsets)
+    bullets[index] = user_session.reworded_bullet
+    user_session.bullet_text, user_session.bullet_offsets = pack_bullets(bullets)
+    user_session.bullet_embeddings[index] = embedding[0]
+
+    user_session.reworded_bullet_index = -1
+    user_session.reworded_bullet = ""
+
+    return user_session
+
+
+
+async def reword_bullet(keyword: str, user_session: User) -> User:
+    user_session.reworded_bullet_index = -1
+
+    if user_session.bullet_embeddings is not None:
+        #embedded once at upload, so ranking is a single matrix-vector product
+        bullets = unpack_bullets(user_session.bullet_text, user_session.bullet_offsets)
+        best_index, best_bullet = await get_best_bullet(keyword, bullets, user_session.bullet_embeddings)
+    else:
+        best_index, best_bullet = await get_best_bullet(keyword, extract_bullets(user_session.resume_html))
     
     # If no suitable bullet found, return unchanged
     if not best_bullet or best_bullet.strip() == '':
@@ -88,7 +159,9 @@ Keyword to incorporate: {keyword}
 
 Reworded bullet point:"""
 
-        completion = await client.chat.completions.create(
+        #identical (bullet, keyword) pairs are served from the local response cache
+        reworded_bullet = await chat_completion(
+            cache=True,
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "You are a professional resume editor. You reword resume bullet points truthfully and professionally. Never exaggerate or add false information."},
@@ -96,14 +169,17 @@ Reworded bullet point:"""
             ],
             temperature=0.3
         )
-        
-        reworded_bullet = completion.choices[0].message.content.strip()
+        reworded_bullet = reworded_bullet.strip()
         
         # Replace the old bullet with the new one in the HTML
-        user_session['resume_html_new'] = user_session['resume_html'].replace(
+        user_session.resume_html_new = user_session.resume_html.replace(
             best_bullet.strip(), 
             '<span class="reworded-bullet">' + reworded_bullet + '</span>'
         )
+
+        #remembered so accept_reword only has to re-embed this one bullet
+        user_session.reworded_bullet_index = best_index
+        user_session.reworded_bullet = reworded_bullet
         
         print(f"\n{'='*60}")
         print(f"Original: {best_bullet.strip()}")
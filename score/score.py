@@ -1,23 +1,57 @@
 import json
-from dotenv import load_dotenv
-import os
-from openai import AsyncOpenAI
 
-from fastapi.responses import HTMLResponse
-from models import Resume, Job
+from models import Resume, Job, User, KeywordTable, KeywordIndex
+from llm.client import chat_completion
+from score.semantic import semantic_matches as find_semantic_matches
+from workers.workers import run_in_pool, PoolSaturated
+from config import SEMANTIC_LLM_FALLBACK
 
-load_dotenv()
-key = os.getenv('OPEN_AI_KEY')
-client = AsyncOpenAI(api_key=key)
+async def catch_keywords(unmatched_job_keywords: list, resume_keywords: KeywordTable, user_session: User) -> User:
+    """
+    Finds semantic matches between job keywords and resume keywords that weren't caught by exact lemma matching.
+    Matches come from the local embedding matcher, borderline scores are double checked with OpenAI
+    when SEMANTIC_LLM_FALLBACK is on. Everything left over goes to user_session.unmatched_keywords.
+    """
+    
+    if not unmatched_job_keywords or not resume_keywords:
+        return user_session
+
+    job_lemmas = [entry['lemma'] for entry in unmatched_job_keywords]
+    resume_lemmas = resume_keywords.lemmas()
+
+    try:
+        #encoding is CPU-bound, keep it off the event loop
+        local_matches, borderline = await run_in_pool(find_semantic_matches, job_lemmas, resume_lemmas)
+    except PoolSaturated:
+        #no room to encode right now, let OpenAI look at everything instead
+        local_matches, borderline = {}, job_lemmas
+
+    #key is the job keyword and the value is the count, like the exact matches
+    semantic_matches = {job_lemma: 1 for job_lemma in local_matches}
+
+    if borderline and SEMANTIC_LLM_FALLBACK:
+        borderline_lemmas = set(borderline)
+        borderline_keywords = [entry for entry in unmatched_job_keywords if entry['lemma'] in borderline_lemmas]
+        print(f"\n=== Checking {len(borderline_keywords)} borderline keywords with OpenAI ===")
+        semantic_matches.update(await llm_catch_keywords(borderline_keywords, resume_keywords))
+
+    user_session.matched_keywords.update(semantic_matches)
 
-async def catch_keywords(unmatched_job_keywords: list, resume_keywords: list, user_session: dict) -> dict:
+    for word in unmatched_job_keywords:
+        if word['lemma'] not in semantic_matches:
+            user_session.unmatched_keywords.append(word['lemma'])
+
+    return user_session
+
+
+async def llm_catch_keywords(unmatched_job_keywords: list, resume_keywords: list) -> dict:
     """
     Uses OpenAI to find semantic matches between job keywords and resume keywords
-    that weren't caught by exact lemma matching.
+    that weren't caught by exact lemma matching. Returns {job keyword: count}.
     """
     
     if not unmatched_job_keywords or not resume_keywords:
-        return user_session
+        return {}
     
     resume_lemmas = []
     job_lemmas = []
@@ -55,7 +89,9 @@ If no semantic matches exist, return an empty array: []
 Do not include any explanation, only the JSON array."""
 
     try:
-        completion = await client.chat.completions.create(
+        #not cached: the match decision depends on the whole keyword lists, which rarely repeat exactly
+        response = await chat_completion(
+            cache=False,
             model="gpt-4o-mini",  # Using gpt-4o-mini for better reasoning at lower cost
             messages=[
                 {"role": "system", "content": "You are a precise keyword matching assistant. Always respond with valid JSON only."},
@@ -63,8 +99,7 @@ Do not include any explanation, only the JSON array."""
             ],
             temperature=0.1  # Low temperature for more consistent results
         )
-        
-        response = completion.choices[0].message.content.strip()
+        response = response.strip()
         
         # Parse JSON response
         matches = json.loads(response)
@@ -77,82 +112,69 @@ Do not include any explanation, only the JSON array."""
             else:
                 semantic_matches[match['job_keyword']] += 1
 
-        user_session['matched_keywords'].update(semantic_matches)
-
-        
-        if unmatched_job_keywords:
-            for word in unmatched_job_keywords:
-                if word['lemma'] not in semantic_matches:
-                    user_session['unmatched_keywords'].append(word['lemma'])
-
-        
-        return user_session
+        return semantic_matches
 
     except json.JSONDecodeError as e:
         print(f"JSON decode error in catch_keywords: {e}")
         print(f"Response was: {response}")
-        return user_session
+        return {}
     except Exception as e:
         print(f"Error in catch_keywords: {e}")
-        return user_session
+        return {}
 
 
+def build_keyword_index(keywords: KeywordTable) -> KeywordIndex:
+    """
+    Map each lemma to its keyword entry so job keywords can be looked up in O(log n) without a dict per resume.
+    Built once per resume and stored on resume.keyword_index.
+    """
+    return keywords.index()
 
 
+def match_keywords(job_keywords: KeywordTable, keyword_index: KeywordIndex) -> tuple[dict, list]:
+    """
+    Exact lemma matching of job keywords against a resume keyword index.
+    Returns {lemma: number of times the resume uses it} for matches, and the unmatched job keyword entries.
+    """
+    matched_job_keywords = {}
+    unmatched_job_keywords = []
 
+    #read the table columns directly, only unmatched job keywords are turned into entry dicts
+    resume_counts = keyword_index.table.counts
+    for i, lemma in enumerate(job_keywords.lemmas()):
+        row = keyword_index.find(lemma)
+        if row < 0:
+            unmatched_job_keywords.append(job_keywords.entry(i))
+        else:
+            matched_job_keywords[lemma] = resume_counts[row]
 
-async def score_resume(user_session: dict) -> dict:
-    #unpack dictionary input into resume and job variables if they exist
-    if not user_session['resume']:
-        return """
-            <div> Hey make sure you have a resume uploaded
-            </div>
-            """
-    else:
-        resume = user_session['resume']
-    
-    if not user_session['job']:
-        return """
-            <div> Hey make sure you have a job uploaded
-            </div>
-            """
-    else:
-        job = user_session['job']
-
-    #give the resume a score based upon the number of keywords in job.keywords and resume.keywords
-
-    job_keyword_count = 0
-    matched_job_keywords = {}  # Track which job keywords were matched
-    unmatched_job_keywords = []
-    
-    # First pass: exact lemma matching
-    for job_entry in job.keywords:
-        job_keyword_count += 1
-        matched = False
-        #add keyword to keyword dictionary if matches a resume keyword, return dictionary matched_job_keywords where the key is the keyword and the value is the count
-        for resume_entry in resume.keywords:
-            #print(f"job keyword: {job_entry['lemma']}, resume keyword: {resume_entry['lemma']}")
-            if job_entry['lemma'] == resume_entry['lemma']:
-                if job_entry['lemma'] not in matched_job_keywords.keys():
-                    matched_job_keywords[job_entry['lemma']] = 1
-                    matched = True
-                else:
-                    job_entry['lemma'] += 1
-                break
-                
-        #add to the unmatched list if the keyword is not found in the resume
-        if not matched:
-            unmatched_job_keywords.append(job_entry)
-
-    #Add the matched keywords to the user_session dictionary
-    user_session['matched_keywords'] = matched_job_keywords
+    return matched_job_keywords, unmatched_job_keywords
+
+
+async def score_resume(user_session: User) -> User:
+    """
+    Fill in user_session.matched_keywords and user_session.unmatched_keywords for the session's resume and job.
+    Exact lemma matches come from the resume's keyword index, the remaining job keywords go through catch_keywords.
+    """
+    resume = user_session.resume
+    job = user_session.job
+
+    #no resume uploaded yet (or an expired session) has no index, and one built for other keywords is stale
+    if resume.keyword_index is None or resume.keyword_index.table is not resume.keywords:
+        resume.keyword_index = build_keyword_index(resume.keywords)
+
+    # First pass: exact lemma matching, one binary search of the sorted resume lemmas per job keyword
+    matched_job_keywords, unmatched_job_keywords = match_keywords(job.keywords, resume.keyword_index)
+
+    #Add the matched keywords to the user session
+    user_session.matched_keywords = matched_job_keywords
     
-    #If there are any unmatched keywords remaining after the first pass, call gpt to double check similar keywords
+    #If there are any unmatched keywords remaining after the first pass, check them for semantic matches
     #adds matched keywords to the user_session dict
     print(f'here it is before gpt {user_session}')
 
     if unmatched_job_keywords:
-        print(f"\n=== Checking {len(unmatched_job_keywords)} unmatched keywords with OpenAI ===")
+        print(f"\n=== Checking {len(unmatched_job_keywords)} unmatched keywords for semantic matches ===")
 
     
         user_session = await catch_keywords(unmatched_job_keywords, resume.keywords, user_session)
@@ -173,12 +195,4 @@ async def score_resume(user_session: dict) -> dict:
     # print(f"Here's what your resume doesn't have: {unmatched_job_keywords}")
 
 
-    html_content = f"""
-            <h1>Your Score Is..{round((len(user_session['matched_keywords']) / job_keyword_count * 100), 1) if job_keyword_count > 0 else 0}
-            </h1>
-            """
-
-    return HTMLResponse(html_content)
-
-
 #
\ No newline at end of file
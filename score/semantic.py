@@ -0,0 +1,35 @@
+import numpy as np
+
+from embed.store import store
+from config import SEMANTIC_MATCH_THRESHOLD, SEMANTIC_BORDERLINE_THRESHOLD
+
+
+def semantic_matches(job_lemmas: list, resume_lemmas: list,
+                     threshold: float = SEMANTIC_MATCH_THRESHOLD,
+                     borderline_threshold: float = SEMANTIC_BORDERLINE_THRESHOLD) -> tuple[dict, list]:
+    """
+    Match job keywords to resume keywords by embedding similarity.
+
+    Embeddings come from the shared keyword store, so only terms it has never seen are encoded,
+    and both keyword sets are compared with one cosine-similarity matrix.
+    Returns {job lemma: closest resume lemma} for scores >= threshold, and the job lemmas whose best
+    score falls in [borderline_threshold, threshold) so the caller can ask OpenAI about them.
+    """
+    if not job_lemmas or not resume_lemmas:
+        return {}, []
+
+    #rows are unit length, so the matrix product is the cosine similarity of every job/resume pair
+    similarity = store.get_many(job_lemmas) @ store.get_many(resume_lemmas).T
+
+    best = similarity.argmax(axis=1)
+    best_scores = similarity[np.arange(len(job_lemmas)), best]
+
+    matches = {}
+    borderline = []
+    for job_lemma, resume_position, score in zip(job_lemmas, best, best_scores):
+        if score >= threshold:
+            matches[job_lemma] = resume_lemmas[resume_position]
+        elif score >= borderline_threshold:
+            borderline.append(job_lemma)
+
+    return matches, borderline
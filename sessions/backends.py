@@ -0,0 +1,248 @@
+import abc
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+
+from models import User
+from sessions.sessions import SessionStore
+from config import (SESSION_BACKEND, SESSION_MAX_ENTRIES, SESSION_IDLE_TTL, SESSION_MAX_BYTES,
+                    SESSION_SQLITE_PATH, SESSION_REDIS_URL, SESSION_REDIS_PREFIX)
+
+
+def dump_user(user: User) -> bytes:
+    return user.to_bytes()
+
+
+def load_user(data: bytes) -> User | None:
+    """
+    Decode a stored session. Sessions written in an older format are treated as missing.
+    """
+    try:
+        return User.from_bytes(data)
+    except (ValueError, TypeError) as e:
+        print(f"Dropping unreadable session: {e}")
+        return None
+
+
+class SessionBackend(abc.ABC):
+    """
+    Where request handlers load a User at the start of a request and save it back before responding.
+
+    The in-memory backend keeps sessions in this process. The SQLite and Redis backends serialize
+    them to a shared store so any worker, or any container behind the balancer, can serve any step.
+    """
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.saves = 0
+
+    @abc.abstractmethod
+    async def load(self, token: str) -> User | None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def save(self, token: str, user: User):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def delete(self, token: str):
+        raise NotImplementedError
+
+    def sweep(self) -> int:
+        """
+        Drop expired sessions, for backends that cannot expire them on their own. Returns the number removed.
+        """
+        return 0
+
+    async def sweep_forever(self, interval: float):
+        """
+        Background sweeper, started from the app's lifespan hook.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.sweep)
+            except Exception as e:
+                print(f"Error sweeping sessions: {e}")
+
+    async def close(self):
+        pass
+
+    def stats(self) -> dict:
+        return {
+            'backend': self.__class__.__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'saves': self.saves,
+        }
+
+
+class MemorySessionBackend(SessionBackend):
+    """
+    Sessions held as live objects in a bounded SessionStore. Only correct with a single worker process.
+    """
+    def __init__(self, store: SessionStore):
+        super().__init__()
+        self.store = store
+
+    async def load(self, token: str) -> User | None:
+        user = self.store.get(token)
+        if user is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return user
+
+    async def save(self, token: str, user: User):
+        self.saves += 1
+        self.store[token] = user
+
+    async def delete(self, token: str):
+        if token in self.store:
+            del self.store[token]
+
+    def sweep(self) -> int:
+        return self.store.sweep()
+
+    def stats(self) -> dict:
+        return {**super().stats(), **self.store.stats()}
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """
+    Sessions serialized into one SQLite file in WAL mode, shared by every worker on the host.
+    """
+    def __init__(self, path: str, max_entries: int, idle_ttl: float):
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries
+        self.idle_ttl = idle_ttl
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS sessions (
+                token TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                saved_at REAL NOT NULL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS sessions_saved_at ON sessions (saved_at)')
+        self._conn.commit()
+
+    def _read(self, token: str) -> bytes | None:
+        with self._lock:
+            row = self._conn.execute('SELECT data, saved_at FROM sessions WHERE token = ?', (token,)).fetchone()
+        if row is None:
+            return None
+
+        data, saved_at = row
+        #every handler saves the session, so saved_at is also the last time it was used
+        if self.idle_ttl and saved_at + self.idle_ttl <= time.time():
+            return None
+        return data
+
+    def _write(self, token: str, data: bytes):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO sessions (token, data, saved_at) VALUES (?, ?, ?)',
+                (token, data, time.time()),
+            )
+            self._conn.commit()
+
+    async def load(self, token: str) -> User | None:
+        data = await asyncio.to_thread(self._read, token)
+        user = await asyncio.to_thread(load_user, data) if data is not None else None
+        if user is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return user
+
+    async def save(self, token: str, user: User):
+        data = await asyncio.to_thread(dump_user, user)
+        await asyncio.to_thread(self._write, token, data)
+        self.saves += 1
+
+    async def delete(self, token: str):
+        def _delete():
+            with self._lock:
+                self._conn.execute('DELETE FROM sessions WHERE token = ?', (token,))
+                self._conn.commit()
+
+        await asyncio.to_thread(_delete)
+
+    def sweep(self) -> int:
+        #drop idle rows, then the least recently saved rows over the limit
+        with self._lock:
+            removed = 0
+            if self.idle_ttl:
+                removed += self._conn.execute('DELETE FROM sessions WHERE saved_at <= ?', (time.time() - self.idle_ttl,)).rowcount
+            (count,) = self._conn.execute('SELECT COUNT(*) FROM sessions').fetchone()
+            if count > self.max_entries:
+                removed += self._conn.execute(
+                    'DELETE FROM sessions WHERE token IN (SELECT token FROM sessions ORDER BY saved_at LIMIT ?)',
+                    (count - self.max_entries,),
+                ).rowcount
+            self._conn.commit()
+            return removed
+
+    async def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RedisSessionBackend(SessionBackend):
+    """
+    Sessions serialized into Redis (or anything speaking its protocol) with an idle TTL on every key,
+    so Redis expires them itself.
+    """
+    def __init__(self, url: str, idle_ttl: float, prefix: str = 'session:'):
+        super().__init__()
+        #redis is only needed when this backend is configured
+        import redis.asyncio
+
+        self.url = url
+        self.idle_ttl = idle_ttl
+        self.prefix = prefix
+        self._client = redis.asyncio.from_url(url)
+
+    async def load(self, token: str) -> User | None:
+        data = await self._client.get(self.prefix + token)
+        user = load_user(data) if data is not None else None
+        if user is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return user
+
+    async def save(self, token: str, user: User):
+        await self._client.set(self.prefix + token, dump_user(user), ex=int(self.idle_ttl) or None)
+        self.saves += 1
+
+    async def delete(self, token: str):
+        await self._client.delete(self.prefix + token)
+
+    async def close(self):
+        await self._client.aclose()
+
+
+def get_backend(name: str = SESSION_BACKEND) -> SessionBackend:
+    """
+    Build the session backend named by SESSION_BACKEND: "memory", "sqlite" or "redis".
+    """
+    if name == 'memory':
+        return MemorySessionBackend(SessionStore(SESSION_MAX_ENTRIES, SESSION_IDLE_TTL, SESSION_MAX_BYTES))
+    if name == 'sqlite':
+        return SQLiteSessionBackend(SESSION_SQLITE_PATH, SESSION_MAX_ENTRIES, SESSION_IDLE_TTL)
+    if name == 'redis':
+        return RedisSessionBackend(SESSION_REDIS_URL, SESSION_IDLE_TTL, SESSION_REDIS_PREFIX)
+    raise ValueError(f"Unknown session backend {name!r}, expected memory, sqlite or redis")
@@ -0,0 +1,164 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from models import User
+
+
+def estimate_size(user: User) -> int:
+    """
+    Rough number of bytes held by a session: its html and text fields, keyword tables and bullet embeddings.
+    """
+    resume = user.resume
+    job = user.job
+
+    size = sys.getsizeof(user)
+    for text in (user.resume_html, user.resume_html_new, user.bullet_text, resume.plaintext, job.plaintext, job.html):
+        size += sys.getsizeof(text)
+
+    for array in (user.bullet_offsets, user.bullet_embeddings):
+        if array is not None:
+            size += array.nbytes
+
+    #keyword strings are interned process-wide and snippets point into the plaintext, so only the columns are counted
+    if resume.keyword_index is not None:
+        size += resume.keyword_index.nbytes()
+    for table in (resume.keywords, job.keywords):
+        size += sys.getsizeof(table) + table.nbytes()
+
+    return size
+
+
+class _Entry():
+    __slots__ = ('user', 'last_access', 'size', 'dirty')
+
+    def __init__(self, user: User, last_access: float):
+        self.user = user
+        self.last_access = last_access
+        self.size = 0
+        #handlers mutate the User they got back in place, so sizes are re-measured by the sweeper once touched
+        self.dirty = True
+
+
+class SessionStore():
+    """
+    Bounded store of User sessions keyed by session token, used like a dict by the request handlers.
+
+    Holds at most max_entries sessions and evicts the least recently used one when full. Sessions idle
+    for longer than idle_ttl seconds are dropped on access and by the sweeper. When max_bytes is set,
+    the sweeper also evicts least recently used sessions until the estimated footprint fits.
+    """
+    def __init__(self, max_entries: int, idle_ttl: float = 0, max_bytes: int = 0):
+        self.max_entries = max_entries
+        self.idle_ttl = idle_ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+
+        self.created = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _expired(self, entry: _Entry, now: float) -> bool:
+        return bool(self.idle_ttl) and now - entry.last_access > self.idle_ttl
+
+    def _remove(self, token: str):
+        entry = self._entries.pop(token)
+        self._bytes -= entry.size
+
+    def get(self, token: str, default=None):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return default
+
+            now = time.monotonic()
+            if self._expired(entry, now):
+                self._remove(token)
+                self.expirations += 1
+                return default
+
+            entry.last_access = now
+            entry.dirty = True
+            self._entries.move_to_end(token)
+            return entry.user
+
+    def __getitem__(self, token: str) -> User:
+        user = self.get(token)
+        if user is None:
+            raise KeyError(token)
+        return user
+
+    def __contains__(self, token: str) -> bool:
+        return self.get(token) is not None
+
+    def __setitem__(self, token: str, user: User):
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+            else:
+                self.created += 1
+
+            self._entries[token] = _Entry(user, time.monotonic())
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def __delitem__(self, token: str):
+        with self._lock:
+            self._remove(token)
+
+    def sweep(self) -> int:
+        """
+        Drop idle sessions, re-measure the ones used since the last sweep and evict down to max_bytes.
+        Returns the number of sessions removed.
+        """
+        removed = 0
+        now = time.monotonic()
+
+        with self._lock:
+            #least recently used first, so expired sessions are all at the front
+            for token in list(self._entries):
+                if not self._expired(self._entries[token], now):
+                    break
+                self._remove(token)
+                self.expirations += 1
+                removed += 1
+
+            dirty = [(token, entry) for token, entry in self._entries.items() if entry.dirty]
+
+        #measuring walks every field of every dirty session, so it is done outside the lock
+        sizes = [(token, entry, estimate_size(entry.user)) for token, entry in dirty]
+
+        with self._lock:
+            for token, entry, size in sizes:
+                if self._entries.get(token) is entry:
+                    self._bytes += size - entry.size
+                    entry.size = size
+                    entry.dirty = False
+
+            while self.max_bytes and self._bytes > self.max_bytes and len(self._entries) > 1:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+                removed += 1
+
+        return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'idle_ttl': self.idle_ttl,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'created': self.created,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+from config import WARMUP_STEPS
+
+WARMUP_TEXT = (
+    "Process Engineering Intern. Developed process control strategies for a distillation column using Aspen Plus. "
+    "Led a HAZOP review and built Python scripts for data analysis."
+)
+
+
+def warm_nlp():
+    from parse.parse_plaintext import get_nlp
+
+    #the first call through the pipeline allocates the tagger's working memory
+    get_nlp()(WARMUP_TEXT)
+
+
+def warm_matcher():
+    from parse.parse_plaintext import get_nlp
+    from parse.keyword_matcher import get_phrase_matcher
+
+    get_phrase_matcher(get_nlp())
+
+
+def warm_embeddings():
+    from embed.embed import get_model
+    from embed.store import store
+
+    get_model()
+    #maps the precomputed keyword matrix
+    store.get_many([])
+
+
+def warm_inference():
+    from parse.parse_plaintext import extract_keywords_and_phrases
+    from embed.embed import encode
+    from embed.store import store
+
+    #one dummy request's worth of work, so the first real user does not pay for lazy initialisation
+    keywords = extract_keywords_and_phrases(WARMUP_TEXT)
+    store.get_many(keywords.lemmas())
+    encode([WARMUP_TEXT])
+
+
+#run in this order, later steps reuse what earlier ones loaded
+STEPS = {
+    "nlp": warm_nlp,
+    "matcher": warm_matcher,
+    "embeddings": warm_embeddings,
+    "inference": warm_inference,
+}
+
+#what /ready reports: ready flips to True once every configured step has finished
+state = {
+    "ready": False,
+    "steps": {},
+    "error": None,
+}
+
+
+async def warm_up(steps: list = WARMUP_STEPS) -> dict:
+    """
+    Run the configured warm-up steps off the event loop, recording how long each one took.
+    A failed step is recorded in state["error"] and leaves the worker not ready.
+    """
+    unknown = [step for step in steps if step not in STEPS]
+    if unknown:
+        state["error"] = f"Unknown warm-up steps {unknown}, expected some of {list(STEPS)}"
+        print(state["error"])
+        return state
+
+    for name in STEPS:
+        if name not in steps:
+            continue
+
+        start = time.perf_counter()
+        try:
+            await asyncio.to_thread(STEPS[name])
+        except Exception as e:
+            state["error"] = f"{name}: {e}"
+            print(f"Warm-up step {name} failed: {e}")
+            return state
+
+        state["steps"][name] = round(time.perf_counter() - start, 3)
+        print(f"Warm-up step {name} done in {state['steps'][name]:.2f}s")
+
+    state["ready"] = True
+    return state
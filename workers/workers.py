@@ -0,0 +1,119 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from config import PARSE_POOL_WORKERS, PARSE_POOL_QUEUE_DEPTH, PDF_PARALLEL_WORKERS
+
+
+class PoolSaturated(Exception):
+    """
+    Raised when the parse pool already has as many jobs running and queued as it is allowed to hold.
+    """
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+#jobs submitted to the pool that have not finished yet (running + queued)
+#released from the worker thread when a job finishes, so it is guarded by a lock
+_in_flight = 0
+_in_flight_lock = threading.Lock()
+
+_process_executor = None
+_process_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=PARSE_POOL_WORKERS, thread_name_prefix='parse')
+
+    return _executor
+
+
+def get_process_executor() -> ProcessPoolExecutor:
+    """
+    Process pool for work that would hold the GIL for long stretches, such as page-parallel PDF extraction.
+    Workers are spawned rather than forked so they never inherit the server's threads, locks or event loop.
+    """
+    global _process_executor
+
+    if _process_executor is None:
+        with _process_executor_lock:
+            if _process_executor is None:
+                _process_executor = ProcessPoolExecutor(max_workers=PDF_PARALLEL_WORKERS,
+                                                        mp_context=multiprocessing.get_context('spawn'))
+
+    return _process_executor
+
+
+def shutdown_process_pool(wait: bool = True):
+    """
+    Stop the process pool, e.g. after a worker process died. A later get_process_executor call starts a fresh one.
+    """
+    global _process_executor
+
+    with _process_executor_lock:
+        executor, _process_executor = _process_executor, None
+
+    if executor is not None:
+        executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def _release(_future):
+    global _in_flight
+
+    with _in_flight_lock:
+        _in_flight -= 1
+
+
+def pool_stats() -> dict:
+    return {
+        'workers': PARSE_POOL_WORKERS,
+        'queue_depth': PARSE_POOL_QUEUE_DEPTH,
+        'in_flight': _in_flight,
+    }
+
+
+async def run_in_pool(func, *args, **kwargs):
+    """
+    Run a blocking function on the parse pool and await its result without blocking the event loop.
+    Raises PoolSaturated instead of queueing when the pool is full.
+    """
+    global _in_flight
+
+    with _in_flight_lock:
+        if _in_flight >= PARSE_POOL_WORKERS + PARSE_POOL_QUEUE_DEPTH:
+            raise PoolSaturated(f'parse pool is full ({_in_flight} jobs running or queued)')
+        _in_flight += 1
+
+    try:
+        future = get_executor().submit(func, *args, **kwargs)
+    except BaseException:
+        _release(None)
+        raise
+
+    #the slot is released when the job really finishes, even if the awaiting request is cancelled first
+    future.add_done_callback(_release)
+
+    return await asyncio.wrap_future(future)
+
+
+
+def shutdown_pool(wait: bool = True):
+    """
+    Stop the parse pool and the process pool on worker shutdown. A later run_in_pool call starts a fresh one.
+    """
+    global _executor
+
+    with _executor_lock:
+        executor, _executor = _executor, None
+
+    if executor is not None:
+        executor.shutdown(wait=wait, cancel_futures=True)
+
+    shutdown_process_pool(wait=wait)